@@ -0,0 +1,203 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+import instrumentation
+import opening_book
+from concurrent.futures import ProcessPoolExecutor
+import scoring
+import strategies
+from candidates import CandidateSet
+from islands import IslandSolver, shutdown_pools
+from simulator import Simulator
+from solver import Solver
+
+# Solvers that can be benchmarked, as (algorithm, solver class, solver options)
+SOLVERS = {"genetic": (0, Solver, {}), "islands": (0, IslandSolver, {})}
+for strategy in strategies.STRATEGIES:
+    SOLVERS[f"knuth-{strategy}"] = (1, Solver, {"strategy": strategy})
+
+# Runs in a fresh interpreter: imports a solver, makes the first move of a new game and prints the times in milliseconds
+# Also reports whether the GUI dependencies were loaded on the way
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+import importlib, json, sys
+board, module, class_name, algorithm, options = json.loads(sys.argv[1])
+solver_class = getattr(importlib.import_module(module), class_name)
+imported = time.perf_counter()
+solver = solver_class(board["code_length"], board["number_of_colors"], board["allow_duplicates"], board["number_of_guesses"], algorithm)
+for name, value in options.items():
+    setattr(solver, name, value)
+solver.use_feedback_table = board["use_feedback_table"]
+solver.new_game()
+solver.next_guess()
+end = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1000, "first_move_ms": (end - imported) * 1000, "total_ms": (end - start) * 1000,
+                  "gui_loaded": any(name in sys.modules for name in ("pygame", "distinctipy"))}))
+"""
+
+# Number of secrets played by a worker per task
+CHUNK_SIZE = 64
+# Relative increases over the baseline that count as a regression
+GUESSES_TOLERANCE = 0.02
+LATENCY_TOLERANCE = 0.25
+
+# Secrets to play, as ranks: every code of the board, or a seeded random sample of them
+def select_secrets(code_length: int, number_of_colors: int, allow_duplicates: bool, sample: int = None, seed: int = 0) -> np.ndarray:
+    ranks = CandidateSet(code_length, number_of_colors, allow_duplicates or code_length > number_of_colors).get_ranks()
+    if sample is not None and sample < len(ranks):
+        ranks = np.sort(np.random.default_rng(seed).choice(ranks, sample, replace=False))
+    return ranks
+
+# Plays a chunk of secrets with one solver in a worker process
+# extra_options holds extra solver attributes (sinks, profile_moves, profile_dir)
+# Every game starts with an empty subtree cache unless the board asks for a warm one, so latencies measure search
+# and do not depend on how secrets were spread over the workers
+# Returns a list of tuples (guesses, solved, latencies)
+def play_secrets(board: dict, solver_name: str, ranks: np.ndarray, seed: int, extra_options: dict = None) -> list:
+    algorithm, solver_class, solver_options = SOLVERS[solver_name]
+    solver_options = {**solver_options, **(extra_options or {})}
+    simulator = Simulator(board["code_length"], board["number_of_colors"], board["allow_duplicates"], board["number_of_guesses"], algorithm,
+                          seed = seed, use_feedback_table = board["use_feedback_table"], solver_class = solver_class, solver_options = solver_options)
+    results = []
+    for secret in scoring.unrank(ranks, board["code_length"], board["number_of_colors"]):
+        if not board.get("warm_cache"):
+            opening_book.subtree_cache.clear()
+        result = simulator.play_game(secret.tolist())
+        results.append((result["guesses"], result["solved"], result["latencies"]))
+    # Island pools started in this worker would otherwise keep it from exiting when the benchmark's pool shuts down
+    shutdown_pools()
+    return results
+
+# Summarizes the games of one solver
+def summarize(results: list, elapsed: float) -> dict:
+    guesses = np.array([result[0] for result in results], dtype=int)
+    solved = np.array([result[1] for result in results], dtype=bool)
+    latencies = np.array([latency for result in results for latency in result[2]], dtype=float) * 1000
+    distribution = {str(count): int(number) for count, number in zip(*np.unique(guesses[solved], return_counts=True))}
+    return {"games": len(results),
+            "mean_guesses": float(guesses[solved].mean()) if solved.any() else None,
+            "max_guesses": int(guesses[solved].max()) if solved.any() else None,
+            "guess_distribution": distribution,
+            "failure_rate": float(1 - solved.mean()) if len(results) else None,
+            "latency_ms": {f"p{q}": float(np.percentile(latencies, q)) if len(latencies) else None for q in (50, 95, 99)},
+            "games_per_second": len(results) / elapsed if elapsed else None}
+
+# Runs every secret through every solver across a process pool
+def run_benchmark(board: dict, solver_names: list, ranks: np.ndarray, workers: int, seed: int = 0, extra_options: dict = None) -> dict:
+    report = {"board": board, "secrets": len(ranks), "solvers": {}}
+    chunks = [ranks[start: start + CHUNK_SIZE] for start in range(0, len(ranks), CHUNK_SIZE)]
+    with ProcessPoolExecutor(workers) as pool:
+        for solver_name in solver_names:
+            start_time = time.perf_counter()
+            futures = [pool.submit(play_secrets, board, solver_name, chunk, seed + i, extra_options) for i, chunk in enumerate(chunks)]
+            results = [result for future in futures for result in future.result()]
+            report["solvers"][solver_name] = summarize(results, time.perf_counter() - start_time)
+    return report
+
+# Cold starts of one solver, each in a new process, summarized by the median of every time
+# process_ms is the whole run of the process, interpreter startup included
+def measure_startup(board: dict, solver_name: str, runs: int) -> dict:
+    algorithm, solver_class, solver_options = SOLVERS[solver_name]
+    argument = json.dumps([board, solver_class.__module__, solver_class.__name__, algorithm, solver_options])
+    samples = []
+    for run in range(runs):
+        start_time = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT, argument], cwd = os.path.dirname(os.path.abspath(__file__)),
+                                capture_output = True, text = True, check = True).stdout
+        sample = json.loads(output)
+        sample["process_ms"] = (time.perf_counter() - start_time) * 1000
+        samples.append(sample)
+    summary = {name: float(np.median([sample[name] for sample in samples])) for name in ("import_ms", "first_move_ms", "total_ms", "process_ms")}
+    summary["gui_loaded"] = any(sample["gui_loaded"] for sample in samples)
+    return summary
+
+# Selects the first guess of the board with a Knuth strategy, once collapsing guesses equivalent by symmetry and once
+# sampling the candidate guesses as without symmetries, reporting how many candidate guesses were pruned and how long it took
+def measure_first_move(board: dict, strategy: str, seed: int = 0) -> dict:
+    code_length, number_of_colors = board["code_length"], board["number_of_colors"]
+    possible_ranks = CandidateSet(code_length, number_of_colors, board["allow_duplicates"] or code_length > number_of_colors).get_ranks()
+    results = {}
+    for name, guess_codes in (("symmetry", np.zeros((0, code_length), dtype=np.uint8)), ("sampled", None)):
+        stats = {}
+        start_time = time.perf_counter()
+        rank = strategies.select_guess(possible_ranks, code_length, number_of_colors, strategy, board["use_feedback_table"],
+                                       rng = np.random.default_rng(seed), guess_codes = guess_codes, stats = stats)
+        stats["seconds"] = time.perf_counter() - start_time
+        stats["pruned"] = stats["guess_pool"] - stats["guesses_scored"]
+        stats["guess"] = scoring.unrank(rank, code_length, number_of_colors).tolist()
+        results[name] = stats
+    return results
+
+# Compares a report with a saved baseline of the same board
+# A solver regresses when it needs more guesses, fails more often or has a slower p95 move latency than its baseline
+def compare(report: dict, baseline: dict) -> dict:
+    if baseline["board"] != report["board"]:
+        return {"comparable": False, "regressions": []}
+    regressions = []
+    for solver_name, summary in report["solvers"].items():
+        if solver_name not in baseline["solvers"]:
+            continue
+        before = baseline["solvers"][solver_name]
+        if summary["mean_guesses"] is not None and before["mean_guesses"] is not None and summary["mean_guesses"] > before["mean_guesses"] * (1 + GUESSES_TOLERANCE):
+            regressions.append({"solver": solver_name, "metric": "mean_guesses", "baseline": before["mean_guesses"], "current": summary["mean_guesses"]})
+        if summary["failure_rate"] is not None and before["failure_rate"] is not None and summary["failure_rate"] > before["failure_rate"]:
+            regressions.append({"solver": solver_name, "metric": "failure_rate", "baseline": before["failure_rate"], "current": summary["failure_rate"]})
+        if summary["latency_ms"]["p95"] is not None and before["latency_ms"]["p95"] is not None and summary["latency_ms"]["p95"] > before["latency_ms"]["p95"] * (1 + LATENCY_TOLERANCE):
+            regressions.append({"solver": solver_name, "metric": "latency_ms.p95", "baseline": before["latency_ms"]["p95"], "current": summary["latency_ms"]["p95"]})
+    for solver_name, summary in report.get("startup", {}).items():
+        before = baseline.get("startup", {}).get(solver_name)
+        if before is not None and summary["total_ms"] > before["total_ms"] * (1 + LATENCY_TOLERANCE):
+            regressions.append({"solver": solver_name, "metric": "startup.total_ms", "baseline": before["total_ms"], "current": summary["total_ms"]})
+    return {"comparable": True, "regressions": regressions}
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Mastermind solvers over every secret or a seeded sample of secrets")
+    parser.add_argument("--code-length", type=int, default=4)
+    parser.add_argument("--colors", type=int, default=6)
+    parser.add_argument("--no-duplicates", action="store_true", help="secrets and candidates never repeat a color")
+    parser.add_argument("--guesses", type=int, default=10, help="guesses allowed before a game counts as failed")
+    parser.add_argument("--solvers", nargs="+", default=["genetic", "knuth-minimax"], choices=sorted(SOLVERS))
+    parser.add_argument("--sample", type=int, help="play a seeded random sample of this many secrets instead of every secret")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--feedback-table", action="store_true", help="use the precomputed feedback table when the board allows it")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--baseline", help="compare against this saved report and exit with 1 on a regression")
+    parser.add_argument("--warm-cache", action="store_true", help="keep the Knuth subtree cache between the games of a worker")
+    parser.add_argument("--startup", type=int, default=0, metavar="RUNS", help="also time this many cold starts to the first move of every solver")
+    parser.add_argument("--first-move", action="store_true", help="also time the first guess of every Knuth solver with and without symmetry reduction")
+    parser.add_argument("--trace", help="append a JSON line per solver move to this file")
+    parser.add_argument("--profile-move", type=int, action="append", help="profile this move (1 for the first guess) of every game with cProfile")
+    parser.add_argument("--profile-dir", default="profiles", help="directory the .prof files of profiled moves are written to")
+    args = parser.parse_args(argv)
+
+    board = {"code_length": args.code_length, "number_of_colors": args.colors, "allow_duplicates": not args.no_duplicates,
+             "number_of_guesses": args.guesses, "use_feedback_table": args.feedback_table, "warm_cache": args.warm_cache}
+    ranks = select_secrets(args.code_length, args.colors, board["allow_duplicates"], args.sample, args.seed)
+    options = {"sinks": [instrumentation.JsonLinesSink(args.trace)] if args.trace else [],
+               "profile_moves": set(args.profile_move or []), "profile_dir": args.profile_dir}
+    report = run_benchmark(board, args.solvers, ranks, args.workers, args.seed, options)
+    if args.first_move:
+        report["first_move"] = {solver_name: measure_first_move(board, SOLVERS[solver_name][2]["strategy"], args.seed)
+                                for solver_name in args.solvers if SOLVERS[solver_name][0] == 1 and solver_name != "knuth-random"}
+    if args.startup:
+        report["startup"] = {solver_name: measure_startup(board, solver_name, args.startup) for solver_name in args.solvers}
+    if args.baseline:
+        with open(args.baseline) as file:
+            report["comparison"] = compare(report, json.load(file))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    return 1 if args.baseline and report["comparison"]["regressions"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+import numpy as np
+import scoring
+
+# Number of candidates scored at a time while filtering, bounds the size of temporary arrays
+FILTER_CHUNK = 1 << 20
+
+# Smallest unsigned integer type able to hold every rank of a board
+def rank_dtype(code_length: int, number_of_colors: int):
+    return np.uint32 if number_of_colors ** code_length <= np.iinfo(np.uint32).max else np.uint64
+
+# Sorted ranks of every code without duplicate colors
+# Codes are grown one position at a time from their prefixes, so only the unused colors of each prefix are ever considered
+def distinct_ranks(code_length: int, number_of_colors: int) -> np.ndarray:
+    colors = np.arange(number_of_colors, dtype=np.int64)
+    ranks = colors.copy()
+    used = np.left_shift(1, colors)
+    for position in range(1, code_length):
+        unused = (used[:, None] >> colors) & 1 == 0
+        ranks = (ranks[:, None] * number_of_colors + colors)[unused]
+        used = (used[:, None] | np.left_shift(1, colors))[unused]
+    return ranks.astype(rank_dtype(code_length, number_of_colors))
+
+# The set of codes that could still be the secret code
+# Codes are stored as sorted ranks in the mixed-radix code space and only built when first needed
+class CandidateSet:
+    def __init__(self, code_length: int, number_of_colors: int, allow_duplicates: bool):
+        self.code_length = code_length
+        self.number_of_colors = number_of_colors
+        self.allow_duplicates = allow_duplicates
+        self.ranks = None
+        self.size = 0
+        # Number of guesses the candidates have been filtered by
+        self.filters = 0
+
+    def build(self):
+        if self.allow_duplicates:
+            self.ranks = np.arange(self.number_of_colors ** self.code_length, dtype=rank_dtype(self.code_length, self.number_of_colors))
+        else:
+            self.ranks = distinct_ranks(self.code_length, self.number_of_colors)
+        self.size = len(self.ranks)
+
+    def __len__(self) -> int:
+        if self.ranks is None:
+            self.build()
+        return self.size
+
+    # Ranks of the remaining candidates, a view into the candidate buffer
+    def get_ranks(self) -> np.ndarray:
+        if self.ranks is None:
+            self.build()
+        return self.ranks[:self.size]
+
+    # Remaining candidates as codes of color indices
+    def get_codes(self) -> np.ndarray:
+        return scoring.unrank(self.get_ranks(), self.code_length, self.number_of_colors)
+
+    # Keeps only the candidates that would have given the guess the same feedback
+    # Kept ranks are compacted to the front of the buffer, so filtering never allocates more than one chunk at a time
+    def filter(self, guess: np.ndarray, feedback: tuple, table = None):
+        ranks = self.get_ranks()
+        packed_feedback = scoring.pack(feedback[0], feedback[1], self.code_length)
+        guess_rank = int(scoring.rank(guess, self.number_of_colors))
+        kept = 0
+        for start in range(0, len(ranks), FILTER_CHUNK):
+            chunk = ranks[start: start + FILTER_CHUNK]
+            if table is not None:
+                packed = table.feedback(guess_rank, chunk)
+            else:
+                exact, wrong = scoring.score(guess, scoring.unrank(chunk, self.code_length, self.number_of_colors), self.number_of_colors)
+                packed = scoring.pack(exact, wrong, self.code_length)
+            survivors = chunk[packed == packed_feedback]
+            self.ranks[kept: kept + len(survivors)] = survivors
+            kept += len(survivors)
+        self.size = kept
+        self.filters += 1
@@ -1,10 +1,19 @@
-import pygame
-import pygame.font
-pygame.font.init()
-
 length = 800
 width = 450
-screen = pygame.display.set_mode((width, length))
-font = pygame.font.SysFont("comicsansms", 30)
-cursor = pygame.Surface((40, 40))
 total_time = 0
+
+# The window, font and cursor are only created once a windowed game starts (see open_window)
+screen = None
+font = None
+cursor = None
+
+# Initializes pygame and opens the game window, the first call only
+def open_window():
+    global screen, font, cursor
+    if screen is not None:
+        return
+    import pygame
+    pygame.init()
+    screen = pygame.display.set_mode((width, length))
+    font = pygame.font.SysFont("comicsansms", 30)
+    cursor = pygame.Surface((40, 40))
@@ -0,0 +1,72 @@
+import numpy as np
+import scoring
+
+# Per-position and per-color constraints on the secret code derived from the feedback of past guesses
+# Every code that could still be the secret satisfies them, so codes that break them can never be eligible
+# Constraints only ever tighten, each new guess is propagated against all the ones before it
+class ConstraintEngine:
+    def __init__(self, code_length: int, number_of_colors: int):
+        self.code_length = code_length
+        self.number_of_colors = number_of_colors
+        # allowed[position, color] is False once color can no longer be at position
+        self.allowed = np.ones((code_length, number_of_colors), dtype=bool)
+        # Bounds on how many times each color appears in the secret code
+        self.min_count = np.zeros(number_of_colors, dtype=np.int64)
+        self.max_count = np.full(number_of_colors, code_length, dtype=np.int64)
+        self.guesses = []
+        self.update_sampling_table()
+
+    # Adds the feedback of a guess (integer-encoded) and propagates every constraint until nothing changes
+    def add_guess(self, guess: np.ndarray, feedback: tuple):
+        exact, wrong = int(feedback[0]), int(feedback[1])
+        self.guesses.append((scoring.color_counts(guess, self.number_of_colors).astype(np.int64), exact + wrong))
+        # No exact positions means no color of the guess is where it was guessed
+        if exact == 0:
+            self.allowed[np.arange(self.code_length), guess] = False
+        changed = True
+        while changed:
+            changed = self.propagate()
+        self.allowed[:, self.max_count == 0] = False
+        self.update_sampling_table()
+
+    # One pass over the color count bounds of every guess, returns whether a bound changed
+    # For a guess with color counts g and e + w = T, the sum over colors of min(g[k], secret[k]) is T, so for each color
+    # T - (most the other colors can contribute) <= min(g[k], secret[k]) <= T - (least the other colors must contribute)
+    def propagate(self) -> bool:
+        min_count = self.min_count.copy()
+        max_count = self.max_count.copy()
+        for counts, total in self.guesses:
+            least = np.minimum(counts, min_count)
+            most = np.minimum(counts, max_count)
+            lower = total - (most.sum() - most)
+            upper = total - (least.sum() - least)
+            # A matched count below the guess's own count of a color is the exact count of that color in the secret
+            max_count = np.where(upper < counts, np.minimum(max_count, upper), max_count)
+            min_count = np.maximum(min_count, np.minimum(lower, counts))
+        # Every secret code has exactly code_length colors
+        max_count = np.minimum(max_count, self.code_length - (min_count.sum() - min_count))
+        # A color allowed nowhere cannot appear at all
+        max_count = np.minimum(max_count, self.allowed.sum(axis=0))
+        changed = not (np.array_equal(min_count, self.min_count) and np.array_equal(max_count, self.max_count))
+        self.min_count = min_count
+        self.max_count = max_count
+        return changed
+
+    # Allowed colors of every position packed to the front of a row, to sample from them without a loop
+    def update_sampling_table(self):
+        self.allowed_count = self.allowed.sum(axis=1)
+        self.allowed_colors = np.argsort(~self.allowed, axis=1, kind="stable").astype(np.uint8)
+
+    # Random colors for the given positions, only ever drawn from the colors still allowed there
+    def sample_colors(self, rng: np.random.Generator, positions: np.ndarray) -> np.ndarray:
+        counts = self.allowed_count[positions]
+        # A position with no allowed color means the feedback was inconsistent, fall back to any color
+        counts = np.where(counts == 0, self.number_of_colors, counts)
+        choices = (rng.random(positions.shape) * counts).astype(np.int64)
+        return self.allowed_colors[positions, choices]
+
+    # Whether each code (one per row) satisfies every position and color count constraint
+    def plausible(self, codes: np.ndarray) -> np.ndarray:
+        positions = self.allowed[np.arange(self.code_length), codes].all(axis=1)
+        counts = scoring.color_counts(codes, self.number_of_colors)
+        return positions & (counts >= self.min_count).all(axis=1) & (counts <= self.max_count).all(axis=1)
@@ -0,0 +1,62 @@
+import os
+import numpy as np
+import scoring
+
+# Tables are stored here unless MASTERMIND_CACHE_DIR is set
+CACHE_DIR = os.environ.get("MASTERMIND_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mastermind"))
+# Largest table that will be built, in bytes (6 colors x 4 pegs is under 2 MB, 8 colors x 6 pegs would be 68 GB)
+MAX_TABLE_BYTES = 256 * 1024 * 1024
+# Number of rows scored at a time while building a table
+BUILD_CHUNK_ROWS = 1024
+
+# Tables already loaded in this process, keyed by path
+loaded_tables = {}
+
+# Size of the code x code table in bytes (one byte per pair)
+def table_size(code_length: int, number_of_colors: int) -> int:
+    return (number_of_colors ** code_length) ** 2
+
+def table_path(code_length: int, number_of_colors: int, cache_dir: str = None) -> str:
+    return os.path.join(cache_dir or CACHE_DIR, f"feedback_{code_length}x{number_of_colors}.npy")
+
+# Scores every code against every code and writes the packed feedback to disk
+# Rows and columns are indexed by code rank
+def build_table(code_length: int, number_of_colors: int, path: str):
+    codes = scoring.unrank(np.arange(number_of_colors ** code_length), code_length, number_of_colors)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    table = np.lib.format.open_memmap(temporary_path, mode="w+", dtype=np.uint8, shape=(len(codes), len(codes)))
+    for start in range(0, len(codes), BUILD_CHUNK_ROWS):
+        exact, wrong = scoring.score_matrix(codes[start: start + BUILD_CHUNK_ROWS], codes, number_of_colors)
+        table[start: start + BUILD_CHUNK_ROWS] = scoring.pack(exact, wrong, code_length)
+    table.flush()
+    del table
+    # Another process may be building the same table, only the finished file is ever visible
+    os.replace(temporary_path, path)
+
+# Precomputed feedback between every pair of codes for a fixed (code_length, number_of_colors)
+class FeedbackTable:
+    def __init__(self, code_length: int, number_of_colors: int, table: np.ndarray):
+        self.code_length = code_length
+        self.number_of_colors = number_of_colors
+        self.table = table
+
+    # Packed feedback of one guess against many codes, all given as ranks
+    def feedback(self, guess_rank: int, ranks: np.ndarray) -> np.ndarray:
+        return self.table[guess_rank][ranks]
+
+    # Packed feedback of N guesses against M codes, all given as ranks
+    def feedback_matrix(self, guess_ranks: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+        return self.table[np.ix_(guess_ranks, ranks)]
+
+# Loads the memory-mapped table for a board, building and saving it first if needed
+# Returns None when the table would be larger than max_bytes so callers can fall back to on-the-fly scoring
+def load_table(code_length: int, number_of_colors: int, cache_dir: str = None, max_bytes: int = MAX_TABLE_BYTES) -> FeedbackTable:
+    if table_size(code_length, number_of_colors) > max_bytes:
+        return None
+    path = table_path(code_length, number_of_colors, cache_dir)
+    if path not in loaded_tables:
+        if not os.path.exists(path):
+            build_table(code_length, number_of_colors, path)
+        loaded_tables[path] = FeedbackTable(code_length, number_of_colors, np.load(path, mmap_mode="r"))
+    return loaded_tables[path]
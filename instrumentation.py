@@ -0,0 +1,61 @@
+import io
+import itertools
+import json
+import os
+
+# Functions listed in the text summary of a profiled move
+PROFILE_LINES = 25
+
+# Profiles written by this process are numbered so games of a benchmark never overwrite each other
+profile_ids = itertools.count(1)
+
+# A sink receives one record (a JSON-serializable dictionary) per solver move
+# Keeps every record in memory, e.g. to aggregate the moves of simulated games
+class MemorySink:
+    def __init__(self):
+        self.records = []
+
+    def record(self, record: dict):
+        self.records.append(record)
+
+# Appends every record as one JSON line to a file
+# The file is only opened while writing so the sink can be sent to worker processes, which append to the same file
+class JsonLinesSink:
+    def __init__(self, path: str):
+        self.path = path
+
+    def record(self, record: dict):
+        with open(self.path, "a") as file:
+            file.write(json.dumps(record) + "\n")
+
+# Prints a one-line summary of every move, for front ends that show progress on stdout
+class ConsoleSink:
+    def record(self, record: dict):
+        fields = [f"move {record['move']}", f"{record['seconds'] * 1000:.1f} ms", f"{record['check_input_calls']} evaluations"]
+        if record["algorithm"] == "genetic":
+            fields += [f"{record['generations']} generations", f"{record['resets']} resets", f"{record['eligible_children']} eligible"]
+        elif record.get("candidates_after") is not None:
+            fields += [f"{record['candidates_before']} -> {record['candidates_after']} candidates"]
+        if record.get("guesses_scored") is not None:
+            fields += [f"{record['guesses_scored']} of {record['guess_pool']} guesses scored"]
+        if record.get("source"):
+            fields.append(f"from {record['source']}")
+        print(", ".join(fields))
+
+# Runs function under cProfile
+# The stats are dumped to a .prof file in profile_dir when one is given, otherwise summarized as text
+# Returns a tuple (result of the function, path of the stats file or text summary)
+# The profiling modules are imported here so they are never loaded by runs that profile nothing
+def profile_call(function, profile_dir: str = None, name: str = "move") -> tuple:
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    result = profiler.runcall(function)
+    if profile_dir is not None:
+        os.makedirs(profile_dir, exist_ok=True)
+        path = os.path.join(profile_dir, f"{name}_{os.getpid()}_{next(profile_ids)}.prof")
+        profiler.dump_stats(path)
+        return (result, path)
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(PROFILE_LINES)
+    return (result, stream.getvalue())
@@ -0,0 +1,162 @@
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import feedback_table
+import scoring
+from solver import Solver
+
+# Genetic algorithm settings copied from the main solver to every island
+ISLAND_SETTINGS = ("population_size", "stall_generations", "crossover_prob", "mutation_prob", "permutation_prob", "inversion_prob",
+                   "exact_positions_weight", "wrong_positions_weight", "required_children", "use_constraints")
+
+# Worker pools shared by every island solver in this process, keyed by number of workers
+# Solvers of concurrent server sessions may ask for a pool from several threads at once
+# Workers are started by a forkserver, forking a process whose other threads may hold locks could deadlock the workers
+pools = {}
+pools_lock = threading.Lock()
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    with pools_lock:
+        if workers not in pools:
+            pools[workers] = ProcessPoolExecutor(workers, mp_context = multiprocessing.get_context("forkserver"))
+        return pools[workers]
+
+@atexit.register
+def shutdown_pools():
+    with pools_lock:
+        for pool in pools.values():
+            pool.shutdown(cancel_futures=True)
+        pools.clear()
+
+# Runs one island for up to generations generations in a worker process
+# The island is a plain Solver over color indices that only lives for this call, so its fitness cache only lasts
+# migration_interval generations
+# Returns a tuple (population, fitness, stall counter, eligible codes, counters), counters being the island's generations, resets,
+# skipped generations and feedback evaluations
+def evolve_island(board: dict, population: np.ndarray, fitness: np.ndarray, stuck: int, generations: int, deadline: float, seed: int) -> tuple:
+    island = Solver(board["code_length"], board["number_of_colors"], True, 0, 0)
+    for name, value in board["settings"].items():
+        setattr(island, name, value)
+    island.new_game()
+    island.rng = np.random.default_rng(seed)
+    island.guess_codes = board["guess_codes"]
+    island.guess_feedback = board["guess_feedback"]
+    island.guess_ranks = board["guess_ranks"]
+    island.update_constraints()
+    if board["use_feedback_table"]:
+        island.feedback_table = feedback_table.load_table(board["code_length"], board["number_of_colors"])
+    if len(population) == 0:
+        island.generate_previous_generation()
+    else:
+        island.previous_generation = population
+        island.previous_fitness = fitness
+    island.stuck = stuck
+    eligible_children = island.natural_selection(generations, deadline)
+    eligible_codes = np.array([code for code, fitness_score in eligible_children], dtype=np.uint8).reshape(-1, board["code_length"])
+    counters = (island.generation_count, island.reset_count, island.skipped_generations, island.check_input_count)
+    return (island.previous_generation, island.previous_fitness, island.stuck, eligible_codes, counters)
+
+# Island-model genetic solver
+# Several independent populations evolve in worker processes and every migration_interval generations
+# the best migrants codes of each island replace the worst codes of the next island (a ring)
+# An iteration stops as soon as any island has produced required_children eligible children, or when the deadline passes
+class IslandSolver(Solver):
+    def __init__(self, code_length: int, number_of_colors: int, allow_duplicates: bool, number_of_guesses: int, algorithm: int):
+        Solver.__init__(self, code_length, number_of_colors, allow_duplicates, number_of_guesses, algorithm)
+        # ISLAND MODEL
+        # One island per core by default, a single island runs as a plain population in this process
+        self.islands = os.cpu_count() or 1
+        self.migration_interval = 10
+        self.migrants = 10
+        # One (population, fitness, stall counter) per island, kept between moves like previous_generation
+        self.island_states = []
+
+    def new_game(self):
+        Solver.new_game(self)
+        self.island_states = []
+
+    # Island populations are generated in the workers, the population of this process is only used by a single island
+    def generate_previous_generation(self):
+        if self.islands <= 1:
+            Solver.generate_previous_generation(self)
+
+    # Replaces the worst codes of every island with the best codes of the island before it
+    def migrate(self):
+        migrants = []
+        for population, fitness, stuck in self.island_states:
+            migrants.append(population[np.argsort(fitness, kind="stable")[:self.migrants]])
+        for i, (population, fitness, stuck) in enumerate(self.island_states):
+            incoming = migrants[i - 1]
+            if len(incoming) == 0 or len(population) <= len(incoming):
+                continue
+            population = population.copy()
+            worst = np.argsort(fitness, kind="stable")[len(population) - len(incoming):]
+            population[worst] = incoming
+            fitness = fitness.copy()
+            fitness[worst] = self.evaluate_fitness_batch(incoming)[0]
+            self.island_states[i] = (population, fitness, stuck)
+
+    # Keeps the result of an island's run and adds its counters to the solver's
+    # Returns the eligible codes the island found
+    def collect_island(self, island: int, result: tuple) -> np.ndarray:
+        population, fitness, stuck, eligible_codes, counters = result
+        self.island_states[island] = (population, fitness, stuck)
+        self.generation_count += counters[0]
+        self.reset_count += counters[1]
+        self.skipped_generations += counters[2]
+        self.check_input_count += counters[3]
+        return eligible_codes
+
+    def natural_selection(self, generations: int = None, deadline: float = None) -> list:
+        if self.islands <= 1:
+            return Solver.natural_selection(self, generations, deadline)
+        if generations is None:
+            generations = self.max_generations
+        self.eligible_children = []
+        start_time = time.perf_counter()
+        pool = self.executor if self.executor is not None else get_pool(self.islands)
+        board = {"code_length": self.code_length, "number_of_colors": self.number_of_colors,
+                 "settings": {name: getattr(self, name) for name in ISLAND_SETTINGS},
+                 "guess_codes": self.guess_codes, "guess_feedback": self.guess_feedback, "guess_ranks": self.guess_ranks,
+                 "use_feedback_table": self.feedback_table is not None}
+        empty = np.zeros((0, self.code_length), dtype=np.uint8)
+        while len(self.island_states) < self.islands:
+            self.island_states.append((empty, np.zeros(0, dtype=np.int64), 0))
+        # Every move starts with fresh stall counters, like a single population
+        self.island_states = [(population, fitness, 0) for population, fitness, stuck in self.island_states]
+
+        gen = 0
+        while gen < generations and (deadline is None or time.time() < deadline):
+            # At least one generation between migrations, so the iteration always advances
+            interval = min(max(1, self.migration_interval), generations - gen)
+            futures = {}
+            for i, (population, fitness, stuck) in enumerate(self.island_states):
+                future = pool.submit(evolve_island, board, population, fitness, stuck, interval, deadline, int(self.rng.integers(2 ** 63)))
+                futures[future] = i
+            # Islands report as they finish, the iteration ends with the first one to find enough eligible children
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when = FIRST_COMPLETED)
+                for future in done:
+                    eligible_codes = self.collect_island(futures[future], future.result())
+                    if len(eligible_codes) >= self.required_children and not self.eligible_children:
+                        # Eligible children always have a fitness score of 0
+                        self.eligible_children = [(scoring.decode(code, self.colors), 0) for code in eligible_codes]
+                if self.eligible_children:
+                    break
+            # Islands still queued are cancelled and keep their population, islands already running finish their
+            # (at most migration_interval) generations and are collected, so no work is left queued for the next move
+            for future in pending:
+                if not future.cancel():
+                    self.collect_island(futures[future], future.result())
+            if self.eligible_children:
+                break
+            gen += interval
+            self.migrate()
+        self.generation_time += time.perf_counter() - start_time
+        return self.eligible_children
+
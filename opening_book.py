@@ -0,0 +1,130 @@
+import argparse
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import scoring
+import strategies
+from candidates import CandidateSet
+from feedback_table import CACHE_DIR
+
+# Live searches remembered per process, keyed by (code_length, number_of_colors, allow_duplicates, strategy, history)
+SUBTREE_CACHE_SIZE = 4096
+
+def book_path(code_length: int, number_of_colors: int, allow_duplicates: bool, strategy: str, cache_dir: str = None) -> str:
+    duplicates = "dup" if allow_duplicates else "nodup"
+    return os.path.join(cache_dir or CACHE_DIR, f"book_{code_length}x{number_of_colors}_{duplicates}_{strategy}.npz")
+
+# A decision tree of Knuth guesses computed offline
+# Node 0 is the first guess, children[node, packed feedback] is the node of the next guess (-1 when off-book or solved)
+class OpeningBook:
+    def __init__(self, code_length: int, guesses: np.ndarray, children: np.ndarray):
+        self.code_length = code_length
+        self.guesses = guesses
+        self.children = children
+
+    # Follows the feedback history down the tree in O(depth)
+    # history is a sequence of (guess rank, packed feedback) pairs
+    # Returns the rank of the next guess, or None when the history left the book
+    def lookup(self, history: list):
+        node = 0
+        for guess_rank, packed in history:
+            if self.guesses[node] != guess_rank:
+                return None
+            node = self.children[node, packed]
+            if node < 0:
+                return None
+        return int(self.guesses[node])
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez_compressed(path, code_length=self.code_length, guesses=self.guesses, children=self.children)
+
+# Builds the decision tree breadth first, every node selects its guess with the strategy over the codes still possible there
+# max_depth limits the number of guesses stored on a path (None for the full tree)
+def build_book(code_length: int, number_of_colors: int, allow_duplicates: bool, strategy: str = "minimax", max_depth: int = None, seed: int = 0) -> OpeningBook:
+    rng = np.random.default_rng(seed)
+    partitions = (code_length + 1) ** 2
+    solved = scoring.pack(code_length, 0, code_length)
+    candidate_set = CandidateSet(code_length, number_of_colors, allow_duplicates)
+    guesses = []
+    children = []
+    # Each pending node is (candidate ranks, depth, guesses on the path to it), a node's index is its position in guesses
+    pending = [(candidate_set.get_ranks(), 1, np.zeros((0, code_length), dtype=np.uint8))]
+    while len(guesses) < len(pending):
+        ranks, depth, path = pending[len(guesses)]
+        guess_rank = strategies.select_guess(ranks, code_length, number_of_colors, strategy, rng = rng, guess_codes = path)
+        guesses.append(guess_rank)
+        links = np.full(partitions, -1, dtype=np.int32)
+        if max_depth is None or depth < max_depth:
+            guess = scoring.unrank(guess_rank, code_length, number_of_colors)
+            path = np.vstack([path, guess])
+            exact, wrong = scoring.score(guess, scoring.unrank(ranks, code_length, number_of_colors), number_of_colors)
+            packed = scoring.pack(exact, wrong, code_length)
+            for feedback in np.unique(packed):
+                if feedback != solved:
+                    links[feedback] = len(pending)
+                    pending.append((ranks[packed == feedback], depth + 1, path))
+        children.append(links)
+    return OpeningBook(code_length, np.array(guesses, dtype=np.int64), np.array(children, dtype=np.int32))
+
+# Books already loaded in this process, keyed by path
+loaded_books = {}
+
+# Loads the book of a board and strategy from disk, returns None if it was never built
+def load_book(code_length: int, number_of_colors: int, allow_duplicates: bool, strategy: str, cache_dir: str = None) -> OpeningBook:
+    path = book_path(code_length, number_of_colors, allow_duplicates, strategy, cache_dir)
+    if path not in loaded_books:
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            loaded_books[path] = OpeningBook(int(data["code_length"]), data["guesses"], data["children"])
+    return loaded_books[path]
+
+# Least recently used cache of guesses found by live search, keyed by board, strategy and feedback history
+# Games in a long-running process that reach an already explored subtree answer from here instead of searching again
+# Solvers of concurrent sessions share the cache from several threads
+class SubtreeCache:
+    def __init__(self, maxsize: int = SUBTREE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return None
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def put(self, key: tuple, guess_rank: int):
+        with self.lock:
+            self.entries[key] = guess_rank
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+subtree_cache = SubtreeCache()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the Knuth opening book of a board")
+    parser.add_argument("--code-length", type=int, default=4)
+    parser.add_argument("--colors", type=int, default=6)
+    parser.add_argument("--no-duplicates", action="store_true")
+    parser.add_argument("--strategy", default="minimax", choices=strategies.STRATEGIES[1:])
+    parser.add_argument("--depth", type=int, help="number of guesses stored on each path, the full tree by default")
+    args = parser.parse_args()
+    book = build_book(args.code_length, args.colors, not args.no_duplicates, args.strategy, args.depth)
+    path = book_path(args.code_length, args.colors, not args.no_duplicates, args.strategy)
+    book.save(path)
+    print(f"{len(book.guesses)} positions written to {path}")
@@ -0,0 +1,30 @@
+import json
+import os
+from feedback_table import CACHE_DIR
+
+def palette_path(number_of_colors: int, cache_dir: str = None) -> str:
+    return os.path.join(cache_dir or CACHE_DIR, f"palette_{number_of_colors}.json")
+
+# Palettes already loaded or generated in this process, keyed by number of colors
+loaded_palettes = {}
+
+# Returns a list of number_of_colors visually distinct (r, g, b) colors
+# Palettes are generated with distinctipy the first time only, then read back from the cache directory,
+# so distinctipy is never imported once the palette of a board was saved
+def get_palette(number_of_colors: int, cache_dir: str = None) -> list:
+    if number_of_colors in loaded_palettes:
+        return loaded_palettes[number_of_colors]
+    path = palette_path(number_of_colors, cache_dir)
+    if os.path.exists(path):
+        with open(path) as file:
+            palette = [tuple(color) for color in json.load(file)]
+    else:
+        import distinctipy
+        palette = [tuple(int(i * 255) for i in color) for color in distinctipy.get_colors(number_of_colors)]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(palette, file)
+        os.replace(temporary_path, path)
+    loaded_palettes[number_of_colors] = palette
+    return palette
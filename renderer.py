@@ -0,0 +1,56 @@
+import pygame
+
+# Frames drawn per second at most while a window is open
+FPS = 30
+
+# Draws onto the game window and only pushes the areas that changed to the display
+# Peg and text surfaces are rendered once and blitted from a cache afterwards
+class Renderer:
+    def __init__(self, screen: pygame.Surface, font: pygame.font.Font, fps: int = FPS):
+        self.screen = screen
+        self.font = font
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+        self.dirty_rects = []
+        self.surfaces = {}
+
+    def fill(self, color: tuple):
+        self.screen.fill(color)
+        self.dirty_rects.append(self.screen.get_rect())
+
+    def line(self, color: tuple, start: tuple, end: tuple, width: int):
+        self.dirty_rects.append(pygame.draw.line(self.screen, color, start, end, width))
+
+    # Draws a peg (a filled box of one color) from a cached surface
+    def peg(self, color: tuple, rect: tuple):
+        rect = pygame.Rect(rect)
+        key = ("peg", color, rect.size)
+        if key not in self.surfaces:
+            surface = pygame.Surface(rect.size)
+            surface.fill(color)
+            self.surfaces[key] = surface
+        self.dirty_rects.append(self.screen.blit(self.surfaces[key], rect))
+
+    # Draws text centered on a point from a cached surface
+    def text(self, text: str, color: tuple, background: tuple, center: tuple):
+        key = ("text", text, color, background)
+        if key not in self.surfaces:
+            self.surfaces[key] = self.font.render(text, True, color, background)
+        surface = self.surfaces[key]
+        self.dirty_rects.append(self.screen.blit(surface, surface.get_rect(center=center)))
+
+    # Pushes the areas drawn since the last update to the display
+    def update(self):
+        if self.dirty_rects:
+            pygame.display.update(self.dirty_rects)
+            self.dirty_rects = []
+
+    # Updates the display and waits for input, capped to one frame per 1 / fps seconds
+    # Blocks in pygame.event.wait instead of busy polling while nothing happens
+    def events(self) -> list:
+        self.update()
+        self.clock.tick(self.fps)
+        event = pygame.event.wait(1000 // self.fps)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
@@ -0,0 +1,77 @@
+import numpy as np
+
+# Codes are encoded as small integer arrays where each element is the index of its color
+# A batch of codes is a 2-D array with one code per row
+
+# Encodes a code of colors into an integer array using a {color: index} mapping
+def encode(code: list, color_index: dict) -> np.ndarray:
+    return np.array([color_index[color] for color in code], dtype=np.uint8)
+
+# Decodes an integer array back into a list of colors
+def decode(code: np.ndarray, colors: list) -> list:
+    return [colors[i] for i in code]
+
+# Counts how many times each color appears in each code
+# Returns an array with the same leading shape as codes and a last axis of length number_of_colors
+def color_counts(codes: np.ndarray, number_of_colors: int) -> np.ndarray:
+    codes = np.asarray(codes)
+    flat = codes.reshape(-1, codes.shape[-1]).astype(np.intp)
+    offsets = flat + np.arange(len(flat), dtype=np.intp)[:, None] * number_of_colors
+    counts = np.bincount(offsets.ravel(), minlength=len(flat) * number_of_colors).astype(np.uint8)
+    return counts.reshape(codes.shape[:-1] + (number_of_colors,))
+
+# Scores one guess against N codes
+# Only the colors of the guess can match, so the other colors are never counted
+# Returns a tuple of arrays (exact, wrong), each of length N
+def score(guess: np.ndarray, codes: np.ndarray, number_of_colors: int) -> tuple:
+    guess = np.asarray(guess)
+    codes = np.asarray(codes)
+    exact = np.zeros(len(codes), dtype=np.uint8)
+    for i in range(len(guess)):
+        exact += codes[:, i] == guess[i]
+    total = np.zeros_like(exact)
+    for color, guess_count in zip(*np.unique(guess, return_counts=True)):
+        code_count = np.zeros_like(exact)
+        for i in range(len(guess)):
+            code_count += codes[:, i] == color
+        total += np.minimum(code_count, guess_count).astype(np.uint8)
+    return (exact, total - exact)
+
+# Scores N guesses against M codes
+# Works one position and one color at a time so no N x M x code_length temporaries are created
+# Returns a tuple of N x M arrays (exact, wrong)
+def score_matrix(guesses: np.ndarray, codes: np.ndarray, number_of_colors: int) -> tuple:
+    guesses = np.asarray(guesses)
+    codes = np.asarray(codes)
+    exact = np.zeros((len(guesses), len(codes)), dtype=np.uint8)
+    for i in range(guesses.shape[1]):
+        exact += guesses[:, i, None] == codes[None, :, i]
+    guess_counts = color_counts(guesses, number_of_colors)
+    code_counts = color_counts(codes, number_of_colors)
+    total = np.zeros_like(exact)
+    for color in range(number_of_colors):
+        total += np.minimum(guess_counts[:, color, None], code_counts[None, :, color])
+    return (exact, total - exact)
+
+# Ranks of codes in the mixed-radix code space, in the same order as itertools.product
+def rank(codes: np.ndarray, number_of_colors: int) -> np.ndarray:
+    codes = np.asarray(codes)
+    code_length = codes.shape[-1]
+    weights = number_of_colors ** np.arange(code_length - 1, -1, -1, dtype=np.int64)
+    return codes.astype(np.int64) @ weights
+
+# Turns ranks back into codes of color indices
+def unrank(ranks: np.ndarray, code_length: int, number_of_colors: int) -> np.ndarray:
+    ranks = np.array(ranks, dtype=np.int64)
+    codes = np.empty(ranks.shape + (code_length,), dtype=np.uint8)
+    for i in range(code_length - 1, -1, -1):
+        ranks, codes[..., i] = np.divmod(ranks, number_of_colors)
+    return codes
+
+# Packs feedback into a single byte as exact * (code_length + 1) + wrong
+def pack(exact: np.ndarray, wrong: np.ndarray, code_length: int) -> np.ndarray:
+    return (np.asarray(exact, dtype=np.uint8) * (code_length + 1) + wrong).astype(np.uint8)
+
+# Unpacks a feedback byte into a tuple (exact, wrong)
+def unpack(packed: np.ndarray, code_length: int) -> tuple:
+    return np.divmod(packed, code_length + 1)
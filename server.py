@@ -0,0 +1,229 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import strategies
+from islands import IslandSolver
+from solver import Solver
+
+OPS = ("new", "guess", "step", "state", "close")
+
+# Solver steps run on this many worker threads at most, so one slow search only ever holds one of them
+SOLVER_WORKERS = min(8, os.cpu_count() or 1)
+MAX_SESSIONS = 1024
+# Colors are stored as uint8 and every code of a board may have to fit in memory
+MAX_COLORS = 255
+MAX_CODES = 1 << 24
+MAX_GUESSES = 100
+# Solver attributes a client may set through "options", with the (smallest, largest) value allowed for numbers
+# use_feedback_table is left out since loading a table can build a file of up to feedback_table.MAX_TABLE_BYTES on the event loop
+SOLVER_OPTIONS = {"strategy": None, "population_size": (0, 10000), "max_generations": (0, 100000), "stall_generations": (0, 100000),
+                  "crossover_prob": (0, 1.0), "mutation_prob": (0, 1.0), "permutation_prob": (0, 1.0), "inversion_prob": (0, 1.0),
+                  "exact_positions_weight": (0, 1000), "wrong_positions_weight": (0, 1000), "required_children": (0, 10000), "deadline": (0, 60.0),
+                  "use_constraints": True, "use_opening_book": True, "use_symmetry": True,
+                  "islands": (0, os.cpu_count() or 1), "migration_interval": (1, 100000), "migrants": (0, 10000)}
+
+# One game hosted by the server
+# Every session owns its solver, so possible_codes, previous_generation and guesses are never shared between games
+class Session:
+    def __init__(self, session_id: int, solver: Solver, secret: list, human_playing: bool):
+        self.session_id = session_id
+        self.solver = solver
+        self.secret = secret
+        self.human_playing = human_playing
+        self.solved = False
+        # Requests of a session are handled one at a time, requests of different sessions run concurrently
+        self.lock = asyncio.Lock()
+
+    def game_over(self) -> bool:
+        return self.solved or len(self.solver.guesses) >= self.solver.number_of_guesses
+
+    # Scores a guess against the secret code and records it
+    def play(self, guess: list) -> dict:
+        feedback = self.solver.check_input(guess, self.secret)
+        self.solver.add_guess(guess, feedback)
+        self.solved = feedback[0] == self.solver.code_length
+        return {"guess": guess, "exact": feedback[0], "wrong": feedback[1], "solved": self.solved, "game_over": self.game_over()}
+
+    def state(self) -> dict:
+        return {"session": self.session_id, "guesses": [[guess, list(feedback)] for guess, feedback in self.solver.guesses],
+                "solved": self.solved, "game_over": self.game_over(), "secret": self.secret if self.game_over() else None}
+
+# Hosts many concurrent games, human or solver-driven
+# Requests and responses are JSON objects, a response echoes the "id" of its request
+#   {"op": "new", "code_length": 4, "colors": 6, "allow_duplicates": true, "guesses": 10, "human": false, "algorithm": 1, "options": {"strategy": "entropy"}}
+#       options are solver attributes listed in SOLVER_OPTIONS, setting "islands" hosts the game on an IslandSolver, "secret" can be given instead of a random one
+#   {"op": "guess", "session": 1, "guess": [0, 1, 2, 3]}  plays a human guess (colors are indices)
+#   {"op": "step", "session": 1}  lets the solver play its next guess
+#   {"op": "state", "session": 1}, {"op": "close", "session": 1}
+class SessionManager:
+    def __init__(self, workers: int = SOLVER_WORKERS, max_sessions: int = MAX_SESSIONS):
+        self.sessions = {}
+        self.session_ids = itertools.count(1)
+        self.max_sessions = max_sessions
+        # CPU-heavy solver steps are offloaded to a bounded executor so the event loop keeps serving the other sessions
+        self.executor = ThreadPoolExecutor(workers)
+
+    def new_session(self, request: dict) -> Session:
+        if len(self.sessions) >= self.max_sessions:
+            raise ValueError("Too many sessions")
+        code_length, colors, guesses = request.get("code_length", 4), request.get("colors", 6), request.get("guesses", 10)
+        if any(type(value) is not int for value in (code_length, colors, guesses)):
+            raise ValueError("code_length, colors and guesses must be integers")
+        if not (1 <= colors <= MAX_COLORS and 1 <= code_length and colors ** code_length <= MAX_CODES and 1 <= guesses <= MAX_GUESSES):
+            raise ValueError(f"Board too large or empty (at most {MAX_COLORS} colors, {MAX_CODES} codes and {MAX_GUESSES} guesses)")
+        if type(request.get("algorithm", 1)) is not int or request.get("algorithm", 1) not in (0, 1):
+            raise ValueError("algorithm must be 0 (genetic) or 1 (Knuth)")
+        if type(request.get("allow_duplicates", True)) is not bool or type(request.get("human", False)) is not bool:
+            raise ValueError("allow_duplicates and human must be true or false")
+        options = request.get("options", {})
+        if not isinstance(options, dict):
+            raise ValueError("options must be a JSON object")
+        for name, value in options.items():
+            self.check_option(name, value)
+        solver_class = IslandSolver if "islands" in options else Solver
+        solver = solver_class(code_length, colors, request.get("allow_duplicates", True), guesses, request.get("algorithm", 1))
+        for name, value in options.items():
+            setattr(solver, name, value)
+        solver.new_game()
+        secret = request.get("secret") or solver.random_code()
+        if not isinstance(secret, list) or len(secret) != solver.code_length or any(color not in solver.color_index for color in secret):
+            raise ValueError("Invalid secret")
+        if not solver.allow_duplicates and len(set(secret)) != len(secret):
+            raise ValueError("Invalid secret, colors cannot repeat without duplicates")
+        session = Session(next(self.session_ids), solver, secret, request.get("human", False))
+        self.sessions[session.session_id] = session
+        return session
+
+    # Only the options in SOLVER_OPTIONS can be set, numbers within their bounds (integers unless the largest value is a float)
+    def check_option(self, name: str, value):
+        if name not in SOLVER_OPTIONS:
+            raise ValueError(f"Unknown solver option {name}")
+        bound = SOLVER_OPTIONS[name]
+        if name == "strategy":
+            if value not in strategies.STRATEGIES:
+                raise ValueError(f"Unknown strategy {value}")
+        elif type(bound) is bool:
+            if type(value) is not bool:
+                raise ValueError(f"Solver option {name} must be true or false")
+        elif name == "deadline" and value is None:
+            return
+        elif type(value) not in ((int, float) if type(bound[1]) is float else (int,)) or not bound[0] <= value <= bound[1]:
+            raise ValueError(f"Solver option {name} must be a number between {bound[0]} and {bound[1]}")
+
+    def get_session(self, request: dict) -> Session:
+        session = self.sessions.get(request.get("session"))
+        if session is None:
+            raise ValueError(f"Unknown session {request.get('session')}")
+        return session
+
+    async def handle(self, request: dict) -> dict:
+        op = request.get("op")
+        if op not in OPS:
+            raise ValueError(f"Unknown op {op}")
+        if op == "new":
+            session = self.new_session(request)
+            return {"session": session.session_id, "code_length": session.solver.code_length, "colors": session.solver.number_of_colors}
+        session = self.get_session(request)
+        async with session.lock:
+            if op == "state":
+                return session.state()
+            if op == "close":
+                del self.sessions[session.session_id]
+                return {"closed": session.session_id}
+            if session.game_over():
+                raise ValueError("Game is over")
+            if op == "guess":
+                guess = request["guess"]
+                if len(guess) != session.solver.code_length or any(color not in session.solver.color_index for color in guess):
+                    raise ValueError("Invalid guess")
+                return session.play(guess)
+            if session.human_playing:
+                raise ValueError("Session is played by a human")
+            guess = await asyncio.get_running_loop().run_in_executor(self.executor, session.solver.next_guess)
+            return session.play(guess)
+
+    # Handles one JSON line and always answers with a JSON object
+    async def respond(self, line: bytes) -> dict:
+        request = {}
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            response = await self.handle(request)
+        except (ValueError, KeyError, TypeError) as error:
+            response = {"error": str(error)}
+        # Any other failure of a request (e.g. running out of memory) is still answered, so the client never waits forever
+        except Exception as error:
+            response = {"error": f"{type(error).__name__}: {error}"}
+        if isinstance(request, dict) and "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    # Serves a stream of JSON lines, every request runs as its own task so a slow solver step never blocks the next request
+    async def serve_stream(self, reader: asyncio.StreamReader, writer):
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def answer(line: bytes):
+            response = await self.respond(line)
+            async with write_lock:
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+
+        while line := await reader.readline():
+            if not line.strip():
+                continue
+            task = asyncio.create_task(answer(line))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+# Writes to stdout for the stdin/stdout protocol
+class StdoutWriter:
+    def write(self, data: bytes):
+        sys.stdout.buffer.write(data)
+
+    async def drain(self):
+        sys.stdout.buffer.flush()
+
+async def serve_stdio(manager: SessionManager):
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    await manager.serve_stream(reader, StdoutWriter())
+
+async def serve_socket(manager: SessionManager, host: str, port: int):
+    async def connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            await manager.serve_stream(reader, writer)
+        finally:
+            writer.close()
+    server = await asyncio.start_server(connection, host, port)
+    async with server:
+        await server.serve_forever()
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Host many concurrent Mastermind games over JSON lines")
+    parser.add_argument("--stdio", action="store_true", help="read requests from stdin and write responses to stdout")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=SOLVER_WORKERS, help="threads available to solver steps")
+    args = parser.parse_args(argv)
+    manager = SessionManager(args.workers)
+    try:
+        asyncio.run(serve_stdio(manager) if args.stdio else serve_socket(manager, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import random
+import time
+import feedback_table
+from solver import Solver
+
+class Simulator:
+    def __init__(self, code_length: int, number_of_colors: int, allow_duplicates: bool, number_of_guesses: int, algorithm: int, seed: int = None, use_feedback_table: bool = False, solver_class: type = Solver, solver_options: dict = None):
+        # INITIALIZED SIMULATION VARIABLES
+        self.code_length = code_length
+        self.number_of_colors = number_of_colors
+        self.allow_duplicates = allow_duplicates
+        self.number_of_guesses = number_of_guesses
+        self.algorithm = algorithm
+        # Solver attributes (e.g. strategy, islands) are set from solver_options on every new solver
+        self.solver_class = solver_class
+        self.solver_options = solver_options or {}
+        # The feedback table is loaded once and shared by every game, None if disabled or too large
+        self.feedback_table = feedback_table.load_table(code_length, number_of_colors) if use_feedback_table else None
+        # Every solver draws its random codes and seeds from this generator, so a seed makes the games reproducible
+        # without touching the global random module
+        self.random = random.Random(seed)
+
+    # Creates a fresh solver for a single game
+    def create_solver(self) -> Solver:
+        solver = self.solver_class(self.code_length, self.number_of_colors, self.allow_duplicates, self.number_of_guesses, self.algorithm)
+        for name, value in self.solver_options.items():
+            setattr(solver, name, value)
+        solver.random = self.random
+        solver.feedback_table = self.feedback_table
+        solver.new_game()
+        return solver
+
+    # Plays a full game against a secret code (a random one if none is given) without any display
+    # Returns a dictionary with the secret, the number of guesses, whether it was solved, the latency of each guess in seconds
+    # how many generations the genetic algorithm made and at what rate, and how many feedback evaluations the solver made
+    def play_game(self, secret: list = None) -> dict:
+        solver = self.create_solver()
+        if secret is None:
+            secret = solver.random_code()
+        latencies = []
+        solved = False
+        while len(solver.guesses) < self.number_of_guesses:
+            start_time = time.perf_counter()
+            guess = solver.next_guess()
+            latencies.append(time.perf_counter() - start_time)
+            feedback = solver.check_input(guess, secret)
+            solver.add_guess(guess, feedback)
+            if feedback[0] == self.code_length:
+                solved = True
+                break
+        return {"secret": list(secret), "guesses": len(solver.guesses), "solved": solved, "latencies": latencies,
+                "generations": solver.generation_count, "generations_per_second": solver.generations_per_second(),
+                "check_input_calls": solver.check_input_count}
+
+    # Plays a number of games against random secret codes
+    def run(self, games: int) -> list:
+        return [self.play_game() for i in range(games)]
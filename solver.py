@@ -0,0 +1,444 @@
+import random
+import time
+import numpy as np
+import scoring
+import feedback_table
+import strategies
+import opening_book
+import instrumentation
+from candidates import CandidateSet
+from constraints import ConstraintEngine
+
+# Times an implausible child is resampled from the allowed colors before it is dropped
+PLAUSIBLE_ATTEMPTS = 3
+
+class Solver:
+    def __init__(self, code_length: int, number_of_colors: int, allow_duplicates: bool, number_of_guesses: int, algorithm: int):
+        # INITIALIZED SOLVER VARIABLES
+        self.code_length = code_length
+        self.number_of_colors = number_of_colors
+        self.allow_duplicates = allow_duplicates or code_length > number_of_colors
+        self.number_of_guesses = number_of_guesses
+        self.algorithm = algorithm
+
+        # Colors are plain integers unless a front end (e.g. the pygame Game) generates its own
+        self.colors = []
+        self.color_index = {}
+        self.guesses = []
+        # Integer-encoded guesses and their feedback, kept in step with self.guesses for vectorized scoring
+        self.guess_codes = np.zeros((0, code_length), dtype=np.uint8)
+        self.guess_feedback = np.zeros((0, 2), dtype=np.uint8)
+        self.guess_ranks = np.zeros(0, dtype=np.int64)
+
+        # FEEDBACK TABLE
+        # When enabled, feedback is looked up in a precomputed code x code table instead of being scored
+        # Boards whose table would be too large silently fall back to on-the-fly scoring
+        self.use_feedback_table = False
+        self.feedback_table = None
+
+        # INSTRUMENTATION
+        # Every move is recorded to each sink (see instrumentation.py), the record of the move being made is self.move
+        # Moves whose number (1 for the first guess) is in profile_moves run under cProfile, the stats are
+        # dumped to profile_dir when it is set and summarized in the record otherwise
+        self.sinks = []
+        self.profile_moves = set()
+        self.profile_dir = None
+        self.move = {}
+
+        # GENETIC ALGORITHM
+        # Populations are 2-D arrays of integer-encoded codes (population x code_length)
+        self.previous_generation = np.zeros((0, code_length), dtype=np.uint8)
+        self.previous_fitness = np.zeros(0, dtype=np.int64)
+        self.current_generation = np.zeros((0, code_length), dtype=np.uint8)
+        self.population_size = 500
+        self.max_generations = 1000
+        self.stall_generations = 25
+        self.crossover_prob = 0.5
+        self.mutation_prob = 0.05
+        self.permutation_prob = 0.05
+        self.inversion_prob = 0.02
+        self.exact_positions_weight = 2
+        self.wrong_positions_weight = 3
+        # An iteration stops once this many distinct eligible children were found, or after deadline seconds (None for no limit)
+        self.required_children = 1
+        self.deadline = None
+        self.stuck = 0
+        self.eligible_children = []
+        self.generation_count = 0
+        self.generation_time = 0.0
+        # Populations replaced after stalling and generations that made too few eligible children, this game
+        self.reset_count = 0
+        self.skipped_generations = 0
+        # Source of the random codes and of the seed of rng on every new game, the random module unless a caller
+        # (e.g. a seeded simulator) gives the solver its own random.Random
+        self.random = random
+        self.rng = np.random.default_rng()
+        # Constraints derived from past feedback keep the operators to plausible children
+        # and the fitness of every distinct code is cached (by rank) until the next guess
+        self.use_constraints = True
+        self.constraints = ConstraintEngine(code_length, number_of_colors)
+        self.fitness_cache = {}
+        # Number of (code, guess) feedback evaluations, whether made by check_input or in a batch
+        self.check_input_count = 0
+
+        # KNUTH
+        # Strategy used to select the next guess, one of strategies.STRATEGIES
+        # Scoring is spread over the executor (e.g. a ProcessPoolExecutor) when one is given and the board is large enough
+        self.strategy = "minimax"
+        self.executor = None
+        # Number of parts the scoring is split into on the executor, one per core when None
+        self.executor_workers = None
+        # Candidate guesses equivalent under the color and position symmetries left by the guesses so far are only scored once
+        self.use_symmetry = True
+        # Built lazily on the first Knuth move that has to search, None until then
+        self.possible_codes = None
+        # When enabled, guesses come from the opening book of the board while the game stays on-book
+        self.use_opening_book = False
+        self.opening_book = None
+
+    # Check the input with the code
+    # Returns a tuple (exact, wrong)
+    def check_input(self, input: list, code: list) -> tuple:
+        self.check_input_count += 1
+        exact_positions = 0
+        wrong_positions = 0
+        input_list = []
+        code_list = []
+        for input_element, code_element in zip(input, code):
+            if input_element == code_element:
+                exact_positions += 1
+            else:
+                input_list.append(input_element)
+                code_list.append(code_element)
+
+        for input_element in input_list:
+            if input_element in code_list:
+                wrong_positions += 1
+                code_list.remove(input_element)
+
+        return (exact_positions, wrong_positions)
+
+    # Knuth's algorithm
+    # Keeps only the possible codes that would have given the previous guesses the same feedback,
+    # then selects the guess that best partitions the remaining possible codes according to the strategy
+    # Positions in the opening book or explored earlier in this process are answered without filtering or searching
+    def knuth(self):
+        history = tuple(zip(self.guess_ranks.tolist(), scoring.pack(self.guess_feedback[:, 0], self.guess_feedback[:, 1], self.code_length).tolist()))
+        rank = self.opening_book.lookup(history) if self.opening_book is not None else None
+        key = (self.code_length, self.number_of_colors, self.allow_duplicates, self.strategy, history)
+        self.move["source"] = "book"
+        if rank is None and self.strategy != "random":
+            self.move["source"] = "cache"
+            rank = opening_book.subtree_cache.get(key)
+        if rank is None:
+            self.move["source"] = "search"
+            start_time = time.perf_counter()
+            if self.possible_codes is None:
+                self.possible_codes = CandidateSet(self.code_length, self.number_of_colors, self.allow_duplicates)
+            self.move["candidates_before"] = len(self.possible_codes)
+            # Catch up on every guess played since the candidates were last filtered
+            for code, feedback in zip(self.guess_codes[self.possible_codes.filters:], self.guess_feedback[self.possible_codes.filters:]):
+                self.check_input_count += len(self.possible_codes)
+                self.possible_codes.filter(code, feedback, self.feedback_table)
+            self.move["candidates_after"] = len(self.possible_codes)
+            self.move["filter_seconds"] = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            guess_codes = self.guess_codes if self.use_symmetry else None
+            rank = strategies.select_guess(self.possible_codes.get_ranks(), self.code_length, self.number_of_colors, self.strategy, self.feedback_table is not None, self.executor, self.rng,
+                                           guess_codes, self.move, self.executor_workers)
+            self.move["select_seconds"] = time.perf_counter() - start_time
+            if self.strategy != "random":
+                opening_book.subtree_cache.put(key, rank)
+        guess = scoring.unrank(rank, self.code_length, self.number_of_colors)
+        return scoring.decode(guess, self.colors)
+
+    # Fitness evaluation function
+    # A guess consists of a (guessed code, feedback code got)
+    # Compare with every previous guess as if they were the secret code
+    # Returns a tuple (fitness score, eligiblity)
+    def evaluate_fitness(self, input: list) -> tuple:
+        fitness_scores, eligibility = self.evaluate_fitness_batch(scoring.encode(input, self.color_index)[None, :])
+        return (int(fitness_scores[0]), bool(eligibility[0]))
+
+    # Batched fitness evaluation function
+    # Scores a whole population (one integer-encoded code per row) against every previous guess in a single vectorized call
+    # Returns a tuple of arrays (fitness scores, eligibility)
+    def evaluate_fitness_batch(self, codes: np.ndarray) -> tuple:
+        self.check_input_count += len(codes) * len(self.guess_codes)
+        if self.feedback_table is not None:
+            exact, wrong = scoring.unpack(self.feedback_table.feedback_matrix(scoring.rank(codes, self.number_of_colors), self.guess_ranks), self.code_length)
+        else:
+            exact, wrong = scoring.score_matrix(codes, self.guess_codes, self.number_of_colors)
+        total_exact_positions_diff = np.abs(exact.astype(np.int16) - self.guess_feedback[:, 0]).sum(axis=1)
+        total_wrong_positions_diff = np.abs(wrong.astype(np.int16) - self.guess_feedback[:, 1]).sum(axis=1)
+        fitness_scores = self.exact_positions_weight * total_exact_positions_diff + self.wrong_positions_weight * total_wrong_positions_diff
+        eligibility = (total_exact_positions_diff == 0) & (total_wrong_positions_diff == 0)
+        return (fitness_scores, eligibility)
+
+    # Fitness evaluation through the per-move cache, only codes not seen since the last guess are scored
+    # Returns a tuple of arrays (fitness scores, eligibility)
+    def cached_fitness(self, codes: np.ndarray) -> tuple:
+        ranks = scoring.rank(codes, self.number_of_colors).tolist()
+        cached = [self.fitness_cache.get(rank) for rank in ranks]
+        misses = [i for i, entry in enumerate(cached) if entry is None]
+        if misses:
+            fitness_scores, eligibility = self.evaluate_fitness_batch(codes[misses])
+            for i, fitness_score, eligible in zip(misses, fitness_scores.tolist(), eligibility.tolist()):
+                cached[i] = self.fitness_cache[ranks[i]] = (fitness_score, eligible)
+        return (np.array([entry[0] for entry in cached], dtype=np.int64), np.array([entry[1] for entry in cached], dtype=bool))
+
+    # Replaces codes that break the constraints with codes sampled from the colors still allowed at every position
+    # Codes that are still implausible after a few attempts are dropped, unless that would leave no code at all
+    def make_plausible(self, codes: np.ndarray) -> np.ndarray:
+        if not self.use_constraints or len(self.guess_codes) == 0:
+            return codes
+        plausible = self.constraints.plausible(codes)
+        for attempt in range(PLAUSIBLE_ATTEMPTS):
+            if plausible.all():
+                break
+            rows = np.flatnonzero(~plausible)
+            codes[rows] = self.constraints.sample_colors(self.rng, np.broadcast_to(np.arange(self.code_length), (len(rows), self.code_length)))
+            plausible[rows] = self.constraints.plausible(codes[rows])
+        return codes[plausible] if plausible.any() else codes
+
+    # Removes duplicate codes from a population, keeping the first occurrence of each
+    # The rank of a code is a perfect hash of its row
+    def distinct(self, codes: np.ndarray) -> np.ndarray:
+        _, first = np.unique(scoring.rank(codes, self.number_of_colors), return_index=True)
+        return codes[np.sort(first)]
+
+    # Crossover function
+    # For every pair of parents a randomly designated "crossover" point takes the information left of the point from the first parent and
+    # right of the point from the second parent to create a child that has some information from both parents, and the other way around for a second child
+    # Returns the children of every pair next to each other
+    def crossover(self, parents1: np.ndarray, parents2: np.ndarray) -> np.ndarray:
+        crossover_points = self.rng.integers(0, self.code_length, len(parents1))[:, None]
+        left = np.arange(self.code_length) < crossover_points
+        children = np.empty((2 * len(parents1), self.code_length), dtype=np.uint8)
+        children[0::2] = np.where(left, parents1, parents2)
+        children[1::2] = np.where(left, parents2, parents1)
+        return children
+
+    # Random positions in [0, code_length - 2] (the last position is never picked by the operators)
+    def random_positions(self, count: int) -> np.ndarray:
+        return self.rng.integers(0, max(1, self.code_length - 1), count)
+
+    # Mutate function
+    # Randomly change one of the colors of every selected child to a random color
+    def mutate(self, children: np.ndarray, selected: np.ndarray):
+        rows = np.flatnonzero(selected)
+        positions = self.random_positions(len(rows))
+        children[rows, positions] = self.constraints.sample_colors(self.rng, positions)
+
+    # Permutation function
+    # Colors of two random positions are swapped in every selected child
+    def permutation(self, children: np.ndarray, selected: np.ndarray):
+        rows = np.flatnonzero(selected)
+        random_positions1 = self.random_positions(len(rows))
+        random_positions2 = self.random_positions(len(rows))
+        random_colors1 = children[rows, random_positions1]
+        children[rows, random_positions1] = children[rows, random_positions2]
+        children[rows, random_positions2] = random_colors1
+
+    # Inversion function
+    # Generates a random sequence of colors between two random positions in every selected child
+    def inversion(self, children: np.ndarray, selected: np.ndarray):
+        rows = np.flatnonzero(selected)
+        random_positions1 = self.random_positions(len(rows))
+        random_positions2 = self.random_positions(len(rows))
+        start = np.minimum(random_positions1, random_positions2)[:, None]
+        end = np.maximum(random_positions1, random_positions2)[:, None]
+        positions = np.arange(self.code_length)
+        random_colors = self.constraints.sample_colors(self.rng, np.broadcast_to(positions, (len(rows), self.code_length)))
+        children[rows] = np.where((positions >= start) & (positions < end), random_colors, children[rows])
+
+    # Randomly generate a popuation with distinct plausible codes
+    def generate_previous_generation(self):
+        codes = self.constraints.sample_colors(self.rng, np.broadcast_to(np.arange(self.code_length), (self.population_size, self.code_length)))
+        self.previous_generation = self.distinct(self.make_plausible(codes))
+        self.previous_fitness = self.cached_fitness(self.previous_generation)[0]
+
+    # Genetic algorithm
+    # An algorithm that uses the evolutionary concepts of natural selection and genetics to generate a guess that is similar to the rest of the guesses played
+    # Each call to this function will be called an iteration. Populations generated within an iteration will be called a generation
+    # Before the first iteration, a random guess is made to provide information that the algorithm can generate generations off of
+    # Populations are 2-D arrays with one integer-encoded code per row, every operator works on a whole generation at once
+    # At most generations generations are made (max_generations by default) and none are started after the deadline (a time.time() value),
+    # the stall counter carries over between calls within a move so an iteration can be run in several parts
+    def natural_selection(self, generations: int = None, deadline: float = None) -> list:
+        gen = 0
+        found = set()
+        self.eligible_children = []
+        if generations is None:
+            generations = self.max_generations
+        start_time = time.perf_counter()
+        # Before an iteration, generate a new initial population of a constant size with randomly generated distinct codes
+        # This is to give the algorithm a vast amount of genes, which is the information in a code,
+        # to explore the game decision tree after taking in the information given by the feedback boxes
+        while gen < generations and (deadline is None or time.time() < deadline):
+            # Perform a reset of the generation if the iteration has been stuck for more generations than allowed by
+            # Replacing the previous generation with a new population
+            if self.stuck > self.stall_generations:
+                self.generate_previous_generation()
+                self.reset_count += 1
+                self.stuck = 0
+            # Populate the current generation with the children of parents from the previous generation
+            # Each child that inherited information from the two parents has a chance for additional information to be manipulated
+            # This is to increase diversity in the gene pool and decrease the chances that the population gets stuck
+            # Every event is either a crossover (50% chance) that makes two children or a code of the previous generation living on,
+            # events are drawn until they have made a full population
+            crossover_events = self.rng.random(self.population_size) < self.crossover_prob
+            produced = np.cumsum(1 + crossover_events)
+            crossover_events = crossover_events[:np.searchsorted(produced, self.population_size) + 1]
+            crossovers = np.count_nonzero(crossover_events)
+            # Crossover chooses a random crossover point and creates a child with information left of the crossover point of parent1
+            # and information right of the crossover point of parent2 and another child with the remanining information
+            # MAKE SELECTING PARENTS DEPEND ON SCORE
+            parents = self.previous_generation[self.rng.integers(0, len(self.previous_generation), (2, crossovers))]
+            children = self.crossover(parents[0], parents[1])
+            # 5% chance of mutation in a child
+            # Mutation randomly changes one piece of information to a random color
+            self.mutate(children, self.rng.random(len(children)) < self.mutation_prob)
+            # 5% chance for permutation to swap the position of two pieces of information in a child
+            self.permutation(children, self.rng.random(len(children)) < self.permutation_prob)
+            # 2% chance of inversion to generate a random sequence of colors between two random points in a child
+            self.inversion(children, self.rng.random(len(children)) < self.inversion_prob)
+            # If a child is not made, take one from the previous generation to live on to the current generation
+            survivors = self.previous_generation[self.rng.integers(0, len(self.previous_generation), len(crossover_events) - crossovers)]
+            # Children that break the constraints from past feedback could never be eligible, so they are replaced before being scored
+            self.current_generation = self.distinct(self.make_plausible(np.concatenate([children, survivors])))
+
+            # After the generation has been made, evaluate the fitness of every child in one batch
+            # Fitness is the score given to a child to numerically describe how similar a child is to the guesses played on the board
+            # Fitness is evaluated by doing the following:
+            #   For every guess that have been played on the board
+            #   Find the number of exact_positions that the child would get if the guess was the secret code (ChildE), then the wrong_positions (ChildW)
+            #   Find the differences between ChildE and GuessE (being the number of exact positions the guess got against the actual secret code)
+            #   and ChildW and GuessW (being the number of wrong positions the guess got against the actual secret code)
+            # If the total sum of these differences is 0, then the code is eligible
+            # If the population is unable to make any eligible children then it is stuck
+            # The fitness score is determined by the sum of the weight of the exact_positions times ChildE and the weight of the wrong_positions times ChildW
+            fitness_scores, eligibility = self.cached_fitness(self.current_generation)
+            self.generation_count += 1
+
+            for code, fitness_score in zip(self.current_generation[eligibility], fitness_scores[eligibility].tolist()):
+                if tuple(code) not in found:
+                    found.add(tuple(code))
+                    self.eligible_children.append((scoring.decode(code, self.colors), fitness_score))
+            # Return the first instance the generations have created enough eligible children
+            if len(self.eligible_children) >= self.required_children:
+                break
+            # Otherwise go to next generation
+            self.skipped_generations += 1
+            self.previous_generation = self.current_generation
+            self.previous_fitness = fitness_scores
+            gen += 1
+            self.stuck += 1
+        self.generation_time += time.perf_counter() - start_time
+        return self.eligible_children
+
+    # Number of generations the genetic algorithm has made per second this game
+    def generations_per_second(self) -> float:
+        return self.generation_count / self.generation_time if self.generation_time else 0.0
+
+    # Colors used by the solver, a front end can override this to use its own palette
+    def generate_colors(self):
+        self.colors = list(range(self.number_of_colors))
+
+    # Randomly creates a code based on the solver's colors
+    def random_code(self) -> list:
+        code = []
+        while len(code) < self.code_length:
+            random_color = self.random.choice(self.colors)
+            while not self.allow_duplicates and random_color in code:
+                random_color = self.random.choice(self.colors)
+            code.append(random_color)
+        return code
+
+    # Resets the solver state for a new game
+    def new_game(self):
+        if not self.colors:
+            self.generate_colors()
+        self.color_index = {color: i for i, color in enumerate(self.colors)}
+        self.guesses = []
+        self.guess_codes = np.zeros((0, self.code_length), dtype=np.uint8)
+        self.guess_feedback = np.zeros((0, 2), dtype=np.uint8)
+        self.guess_ranks = np.zeros(0, dtype=np.int64)
+        if self.use_feedback_table and self.feedback_table is None:
+            self.feedback_table = feedback_table.load_table(self.code_length, self.number_of_colors)
+        if self.use_opening_book and self.opening_book is None:
+            self.opening_book = opening_book.load_book(self.code_length, self.number_of_colors, self.allow_duplicates, self.strategy)
+        # Seeded from self.random so seeding it makes whole games reproducible
+        self.rng = np.random.default_rng(self.random.getrandbits(64))
+        self.previous_generation = np.zeros((0, self.code_length), dtype=np.uint8)
+        self.previous_fitness = np.zeros(0, dtype=np.int64)
+        self.current_generation = np.zeros((0, self.code_length), dtype=np.uint8)
+        self.eligible_children = []
+        self.stuck = 0
+        self.generation_count = 0
+        self.generation_time = 0.0
+        self.reset_count = 0
+        self.skipped_generations = 0
+        self.constraints = ConstraintEngine(self.code_length, self.number_of_colors)
+        self.fitness_cache = {}
+        self.check_input_count = 0
+        self.possible_codes = None
+
+    # Propagates the guesses added since the last call into the constraints
+    # Only the genetic algorithm uses the constraints, so they are caught up lazily before it runs
+    def update_constraints(self):
+        if not self.use_constraints:
+            return
+        for code, feedback in zip(self.guess_codes[len(self.constraints.guesses):], self.guess_feedback[len(self.constraints.guesses):]):
+            self.constraints.add_guess(code, feedback)
+
+    # Records the feedback a guess got against the secret code
+    def add_guess(self, guess: list, feedback: tuple):
+        self.guesses.append((guess, feedback))
+        self.guess_codes = np.vstack([self.guess_codes, scoring.encode(guess, self.color_index)])
+        self.guess_feedback = np.vstack([self.guess_feedback, np.array(feedback, dtype=np.uint8)])
+        self.guess_ranks = np.append(self.guess_ranks, scoring.rank(self.guess_codes[-1], self.number_of_colors))
+        # Cached fitness scores were against the previous guesses only
+        self.fitness_cache = {}
+
+    # Returns the next guess of the selected algorithm (0 for GENETIC, 1 FOR KNUTH)
+    # The move is recorded to every sink, with the counters of this move only
+    def next_guess(self) -> list:
+        number = len(self.guesses) + 1
+        self.move = {"move": number, "algorithm": "genetic" if self.algorithm == 0 else "knuth"}
+        counters = (self.check_input_count, self.generation_count, self.reset_count, self.skipped_generations)
+        start_time = time.perf_counter()
+        if number in self.profile_moves:
+            guess, self.move["profile"] = instrumentation.profile_call(self.select_guess, self.profile_dir, f"move{number}")
+        else:
+            guess = self.select_guess()
+        self.move["seconds"] = time.perf_counter() - start_time
+        self.move["check_input_calls"] = self.check_input_count - counters[0]
+        if self.algorithm == 0:
+            self.move["generations"] = self.generation_count - counters[1]
+            self.move["resets"] = self.reset_count - counters[2]
+            self.move["skipped_generations"] = self.skipped_generations - counters[3]
+            self.move["eligible_children"] = len(self.eligible_children)
+        else:
+            self.move["strategy"] = self.strategy
+        for sink in self.sinks:
+            sink.record(self.move)
+        return guess
+
+    # Selects the next guess without recording it
+    # The first genetic guess is random to give the algorithm information to work off of
+    def select_guess(self) -> list:
+        if self.algorithm == 0:
+            if not self.guesses:
+                return [self.random.choice(self.colors) for i in range(self.code_length)]
+            self.update_constraints()
+            if len(self.previous_generation) == 0:
+                self.generate_previous_generation()
+            self.stuck = 0
+            deadline = time.time() + self.deadline if self.deadline is not None else None
+            eligible_children = self.natural_selection(deadline = deadline)
+            # The genetic algorithm ran out of generations, fall back to a random guess
+            if not eligible_children:
+                return self.random_code()
+            return sorted(eligible_children, key = lambda i: i[1])[0][0]
+        return self.knuth()
@@ -0,0 +1,121 @@
+import os
+import numpy as np
+import scoring
+import feedback_table
+import symmetry
+
+# Guess selection strategies for the Knuth solver
+# "random" picks any remaining possible code, the others score candidate guesses by how they would partition the remaining codes:
+#   minimax: smallest worst case partition (Knuth)
+#   expected_size: smallest expected partition size
+#   entropy: largest information gain
+#   most_parts: largest number of non-empty partitions
+STRATEGIES = ("random", "minimax", "expected_size", "entropy", "most_parts")
+
+# Above this many codes the guess pool and the remaining codes are sampled instead of scored exhaustively
+MAX_GUESS_POOL = 2048
+MAX_SCORED_CODES = 4096
+# Fewer candidate guesses leave room for more scored codes, up to this many (guess, code) pairs
+MAX_SCORED_PAIRS = MAX_GUESS_POOL * MAX_SCORED_CODES
+# Number of (guess, code) pairs scored at once, bounds the size of temporary arrays
+CHUNK_PAIRS = 1 << 21
+# Collapsing symmetric guesses is only worth its cost when scoring the pool would take at least this many (guess, code) pairs
+SYMMETRY_PAIRS = 1 << 16
+# Scoring is only spread over an executor when there are at least this many (guess, code) pairs
+PARALLEL_PAIRS = 1 << 23
+
+# Counts how many codes land in each feedback partition for every guess
+# packed is a G x N array of packed feedback, returns a G x (code_length + 1) ** 2 array
+def partition_sizes(packed: np.ndarray, code_length: int) -> np.ndarray:
+    partitions = (code_length + 1) ** 2
+    offsets = packed.astype(np.int64) + np.arange(len(packed), dtype=np.int64)[:, None] * partitions
+    return np.bincount(offsets.ravel(), minlength=len(packed) * partitions).reshape(len(packed), partitions)
+
+# Turns partition sizes into one score per guess, lower is better for every strategy
+def strategy_scores(sizes: np.ndarray, strategy: str) -> np.ndarray:
+    if strategy == "minimax":
+        return sizes.max(axis=1).astype(np.float64)
+    if strategy == "expected_size":
+        return (sizes.astype(np.float64) ** 2).sum(axis=1) / sizes.sum(axis=1)
+    if strategy == "entropy":
+        probabilities = sizes / sizes.sum(axis=1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            information = np.where(probabilities > 0, probabilities * np.log2(probabilities), 0)
+        return information.sum(axis=1)
+    if strategy == "most_parts":
+        return -(sizes > 0).sum(axis=1).astype(np.float64)
+    raise ValueError(f"Unknown strategy {strategy}")
+
+# Scores guesses (given as ranks) against the remaining codes (given as ranks)
+# Uses the feedback table when one is available for the board and works in chunks to keep memory bounded
+def score_guesses(guess_ranks: np.ndarray, code_ranks: np.ndarray, code_length: int, number_of_colors: int, strategy: str, use_table: bool) -> np.ndarray:
+    table = feedback_table.load_table(code_length, number_of_colors) if use_table else None
+    codes = None if table is not None else scoring.unrank(code_ranks, code_length, number_of_colors)
+    chunk = max(1, CHUNK_PAIRS // max(1, len(code_ranks)))
+    scores = np.empty(len(guess_ranks), dtype=np.float64)
+    for start in range(0, len(guess_ranks), chunk):
+        ranks = guess_ranks[start: start + chunk]
+        if table is not None:
+            packed = table.feedback_matrix(ranks, code_ranks)
+        else:
+            exact, wrong = scoring.score_matrix(scoring.unrank(ranks, code_length, number_of_colors), codes, number_of_colors)
+            packed = scoring.pack(exact, wrong, code_length)
+        scores[start: start + chunk] = strategy_scores(partition_sizes(packed, code_length), strategy)
+    return scores
+
+# Selects the next guess for a set of remaining possible codes (given as sorted ranks)
+# Every code of the board is a candidate guess, larger boards are kept tractable by sampling the candidate guesses and the scored codes
+# When the guesses played so far are given (integer-encoded, one per row), candidate guesses that are equivalent under the symmetries
+# they left unbroken are collapsed first, so every code of boards up to symmetry.MAX_ENUMERATED_CODES codes can be considered
+# Ties are broken in favour of guesses that could still be the secret code, then by the lowest rank
+# stats, when given, receives the number of candidate guesses before and after collapsing and the number of scored codes
+# Scoring is split into workers parts on the executor (one per core when None)
+# Returns the rank of the selected guess
+def select_guess(possible_ranks: np.ndarray, code_length: int, number_of_colors: int, strategy: str = "minimax", use_table: bool = False, executor = None,
+                 rng: np.random.Generator = None, guess_codes: np.ndarray = None, stats: dict = None, workers: int = None) -> int:
+    if len(possible_ranks) == 0:
+        raise ValueError("feedback is inconsistent, no code is possible")
+    if rng is None:
+        rng = np.random.default_rng()
+    if strategy == "random":
+        return int(possible_ranks[rng.integers(len(possible_ranks))])
+    # With one or two codes left guessing one of them is always optimal
+    if len(possible_ranks) <= 2:
+        return int(possible_ranks[0])
+    total_codes = number_of_colors ** code_length
+    # Enumerating the board only pays off when the symmetries can collapse it to about a pool of guesses
+    enumerate_board = guess_codes is not None and total_codes <= symmetry.MAX_ENUMERATED_CODES and \
+        total_codes <= MAX_GUESS_POOL * symmetry.group_order(guess_codes, code_length, number_of_colors)
+    if total_codes <= MAX_GUESS_POOL or enumerate_board:
+        guess_ranks = np.arange(total_codes, dtype=np.int64)
+    else:
+        # Half of the pool comes from the remaining codes, the other half from the whole board
+        sampled = rng.choice(possible_ranks, min(len(possible_ranks), MAX_GUESS_POOL // 2), replace=False)
+        guess_ranks = np.unique(np.concatenate([sampled.astype(np.int64), rng.integers(0, total_codes, MAX_GUESS_POOL // 2)]))
+    pool = len(guess_ranks)
+    if guess_codes is not None and pool * len(possible_ranks) >= SYMMETRY_PAIRS:
+        guess_ranks = symmetry.reduce_guesses(guess_ranks, guess_codes, code_length, number_of_colors)
+    if len(guess_ranks) > MAX_GUESS_POOL:
+        # Still too many, sample as above among the collapsed guesses
+        possible = np.isin(guess_ranks, possible_ranks)
+        sampled = rng.choice(guess_ranks[possible], min(np.count_nonzero(possible), MAX_GUESS_POOL // 2), replace=False)
+        others = rng.choice(guess_ranks[~possible], min(np.count_nonzero(~possible), MAX_GUESS_POOL - len(sampled)), replace=False)
+        guess_ranks = np.sort(np.concatenate([sampled, others]))
+    code_ranks = possible_ranks
+    scored_codes = max(MAX_SCORED_CODES, MAX_SCORED_PAIRS // len(guess_ranks))
+    if len(code_ranks) > scored_codes:
+        code_ranks = np.sort(rng.choice(code_ranks, scored_codes, replace=False))
+    if stats is not None:
+        stats.update({"guess_pool": pool, "guesses_scored": len(guess_ranks), "codes_scored": len(code_ranks)})
+
+    if executor is not None and len(guess_ranks) * len(code_ranks) >= PARALLEL_PAIRS:
+        chunks = np.array_split(guess_ranks, workers or os.cpu_count() or 1)
+        futures = [executor.submit(score_guesses, chunk, code_ranks, code_length, number_of_colors, strategy, use_table) for chunk in chunks]
+        scores = np.concatenate([future.result() for future in futures])
+    else:
+        scores = score_guesses(guess_ranks, code_ranks, code_length, number_of_colors, strategy, use_table)
+
+    positions = np.minimum(np.searchsorted(possible_ranks, guess_ranks), len(possible_ranks) - 1)
+    not_possible = possible_ranks[positions] != guess_ranks
+    best = np.lexsort((guess_ranks, not_possible, scores))[0]
+    return int(guess_ranks[best])
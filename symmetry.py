@@ -0,0 +1,60 @@
+import math
+import numpy as np
+import scoring
+
+# Codes whose symmetry keys are computed at once, bounds the size of temporary arrays
+KEY_CHUNK = 1 << 15
+# Boards with at most this many codes consider every code as a candidate guess before equivalent ones are collapsed
+MAX_ENUMERATED_CODES = 1 << 20
+
+# Symmetries of the board left unbroken by the guesses so far (integer-encoded, one per row):
+#   colors that were never guessed can be swapped with each other
+#   positions where every guess has the same color can be swapped with each other
+# Permuting colors and positions this way maps every past guess onto itself, so the remaining possible codes are mapped onto themselves
+# and two guesses related by such a permutation split them into partitions of the same sizes
+# Returns a tuple (mask of the free colors, class of every position)
+def unbroken_symmetries(guess_codes: np.ndarray, code_length: int, number_of_colors: int) -> tuple:
+    free = np.ones(number_of_colors, dtype=bool)
+    free[guess_codes.ravel()] = False
+    if len(guess_codes) == 0:
+        return (free, np.zeros(code_length, dtype=np.intp))
+    classes = np.unique(guess_codes.T, axis=0, return_inverse=True)[1].reshape(-1)
+    return (free, classes)
+
+# Number of color and position permutations in the unbroken symmetries
+# A board of N codes has at least N / order classes of equivalent codes
+def group_order(guess_codes: np.ndarray, code_length: int, number_of_colors: int) -> int:
+    free, classes = unbroken_symmetries(guess_codes, code_length, number_of_colors)
+    order = math.factorial(int(free.sum()))
+    for size in np.bincount(classes).tolist():
+        order *= math.factorial(size)
+    return order
+
+# Key of every code (one per row), equal for two codes exactly when a symmetry maps one onto the other
+# A code is described by how often each color appears in each class of positions,
+# the rows of the free colors are sorted since free colors can be renamed
+def symmetry_keys(codes: np.ndarray, free: np.ndarray, classes: np.ndarray, number_of_colors: int) -> np.ndarray:
+    code_length = codes.shape[1]
+    class_count = int(classes.max()) + 1
+    offsets = (np.arange(len(codes), dtype=np.intp)[:, None] * number_of_colors + codes) * class_count + classes
+    counts = np.bincount(offsets.ravel(), minlength=len(codes) * number_of_colors * class_count).reshape(len(codes), number_of_colors, class_count)
+    fixed = counts[:, ~free, :].reshape(len(codes), -1)
+    # Every row of a free color packed into one integer, as digits in base code_length + 1
+    rows = counts[:, free, :] @ ((code_length + 1) ** np.arange(class_count, dtype=np.int64))
+    return np.concatenate([fixed, -np.sort(-rows, axis=1)], axis=1)
+
+# Collapses candidate guesses (given as sorted ranks) that are equivalent under the unbroken symmetries
+# Keeps the lowest rank of each class of equivalent guesses, so the selected guess is the same as without collapsing
+def reduce_guesses(guess_ranks: np.ndarray, guess_codes: np.ndarray, code_length: int, number_of_colors: int) -> np.ndarray:
+    free, classes = unbroken_symmetries(guess_codes, code_length, number_of_colors)
+    # Packed rows would overflow, treat the free colors as fixed (fewer guesses are collapsed, but never wrongly)
+    if (code_length + 1) ** (int(classes.max()) + 1) >= 2 ** 62:
+        free[:] = False
+    keys = []
+    for start in range(0, len(guess_ranks), KEY_CHUNK):
+        codes = scoring.unrank(guess_ranks[start: start + KEY_CHUNK], code_length, number_of_colors)
+        keys.append(symmetry_keys(codes, free, classes, number_of_colors))
+    keys = np.ascontiguousarray(np.concatenate(keys))
+    keys = keys.view(np.dtype((np.void, keys.dtype.itemsize * keys.shape[1]))).ravel()
+    _, first = np.unique(keys, return_index=True)
+    return guess_ranks[np.sort(first)]
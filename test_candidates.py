@@ -0,0 +1,24 @@
+import itertools
+import numpy as np
+import pytest
+import scoring
+from candidates import CandidateSet, distinct_ranks
+
+# Ranks of the codes without duplicate colors, in the same order as filtering itertools.product
+@pytest.mark.parametrize("code_length, number_of_colors", [(4, 6), (5, 8), (3, 3), (1, 4)])
+def test_distinct_ranks_match_product(code_length: int, number_of_colors: int):
+    expected = [i for i, code in enumerate(itertools.product(range(number_of_colors), repeat=code_length)) if len(set(code)) == code_length]
+    assert distinct_ranks(code_length, number_of_colors).tolist() == expected
+
+# Filtering keeps exactly the codes that would have given the guess the same feedback
+def test_candidate_filter_keeps_consistent_codes():
+    rng = np.random.default_rng(1)
+    candidate_set = CandidateSet(4, 6, True)
+    secret = rng.integers(0, 6, 4).astype(np.uint8)
+    for guess in rng.integers(0, 6, (3, 4)).astype(np.uint8):
+        before = candidate_set.get_codes()
+        feedback = tuple(int(i[0]) for i in scoring.score(guess, secret[None, :], 6))
+        candidate_set.filter(guess, feedback)
+        exact, wrong = scoring.score(guess, before, 6)
+        assert (candidate_set.get_codes() == before[(exact == feedback[0]) & (wrong == feedback[1])]).all()
+    assert scoring.rank(secret, 6) in candidate_set.get_ranks()
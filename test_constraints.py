@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+import scoring
+from constraints import ConstraintEngine
+
+BOARDS = [(4, 6), (5, 8), (3, 2), (6, 4)]
+
+def random_codes(rng: np.random.Generator, count: int, code_length: int, number_of_colors: int) -> np.ndarray:
+    return rng.integers(0, number_of_colors, (count, code_length)).astype(np.uint8)
+
+# However the guesses go, the constraints never rule out the real secret
+@pytest.mark.parametrize("code_length, number_of_colors", BOARDS)
+def test_constraints_keep_secret(code_length: int, number_of_colors: int):
+    rng = np.random.default_rng(code_length * 10 + number_of_colors)
+    for game in range(50):
+        secret = random_codes(rng, 1, code_length, number_of_colors)
+        engine = ConstraintEngine(code_length, number_of_colors)
+        for guess in random_codes(rng, 8, code_length, number_of_colors):
+            exact, wrong = scoring.score(guess, secret, number_of_colors)
+            engine.add_guess(guess, (int(exact[0]), int(wrong[0])))
+            assert engine.plausible(secret)[0]
@@ -0,0 +1,18 @@
+import numpy as np
+import scoring
+import feedback_table
+from solver import Solver
+
+# The precomputed table holds the packed feedback of check_input for every pair of codes
+def test_feedback_table_matches_check_input(tmp_path):
+    code_length, number_of_colors = 4, 5
+    table = feedback_table.load_table(code_length, number_of_colors, str(tmp_path))
+    solver = Solver(code_length, number_of_colors, True, 10, 1)
+    rng = np.random.default_rng(0)
+    guess_ranks = rng.integers(0, number_of_colors ** code_length, 20)
+    code_ranks = np.arange(number_of_colors ** code_length)
+    exact, wrong = scoring.unpack(table.feedback_matrix(guess_ranks, code_ranks), code_length)
+    codes = scoring.unrank(code_ranks, code_length, number_of_colors)
+    for i, guess in enumerate(scoring.unrank(guess_ranks, code_length, number_of_colors)):
+        expected = np.array([solver.check_input(guess.tolist(), code.tolist()) for code in codes])
+        assert (exact[i] == expected[:, 0]).all() and (wrong[i] == expected[:, 1]).all()
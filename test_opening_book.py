@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+import opening_book
+import scoring
+from candidates import CandidateSet
+from solver import Solver
+
+# (code_length, number_of_colors, allow_duplicates, strategy)
+BOARDS = [(4, 6, True, "minimax"), (3, 5, True, "entropy"), (4, 5, False, "expected_size")]
+
+# Along played games, the book answers every position with the guess a live search without the book selects
+@pytest.mark.parametrize("code_length, number_of_colors, allow_duplicates, strategy", BOARDS)
+def test_book_matches_live_search(code_length: int, number_of_colors: int, allow_duplicates: bool, strategy: str):
+    book = opening_book.build_book(code_length, number_of_colors, allow_duplicates, strategy, max_depth = 3)
+    rng = np.random.default_rng(code_length * 10 + number_of_colors)
+    secrets = CandidateSet(code_length, number_of_colors, allow_duplicates).get_codes()
+    for secret in secrets[rng.choice(len(secrets), 8, replace=False)].tolist():
+        solver = Solver(code_length, number_of_colors, allow_duplicates, 10, 1)
+        solver.strategy = strategy
+        solver.new_game()
+        while len(solver.guesses) < 3:
+            history = list(zip(solver.guess_ranks.tolist(), scoring.pack(solver.guess_feedback[:, 0], solver.guess_feedback[:, 1], code_length).tolist()))
+            opening_book.subtree_cache.clear()
+            guess = solver.next_guess()
+            assert solver.move["source"] == "search"
+            assert book.lookup(history) == scoring.rank(np.array(guess), number_of_colors)
+            feedback = solver.check_input(guess, secret)
+            if feedback[0] == code_length:
+                break
+            solver.add_guess(guess, feedback)
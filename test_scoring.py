@@ -0,0 +1,30 @@
+import itertools
+import numpy as np
+import pytest
+import scoring
+from solver import Solver
+
+BOARDS = [(4, 6), (5, 8), (3, 2), (6, 4)]
+
+def random_codes(rng: np.random.Generator, count: int, code_length: int, number_of_colors: int) -> np.ndarray:
+    return rng.integers(0, number_of_colors, (count, code_length)).astype(np.uint8)
+
+# score and score_matrix give the same feedback as check_input, duplicate colors included
+@pytest.mark.parametrize("code_length, number_of_colors", BOARDS)
+def test_score_matches_check_input(code_length: int, number_of_colors: int):
+    rng = np.random.default_rng(code_length * 100 + number_of_colors)
+    solver = Solver(code_length, number_of_colors, True, 10, 1)
+    guesses = random_codes(rng, 30, code_length, number_of_colors)
+    codes = random_codes(rng, 200, code_length, number_of_colors)
+    matrix_exact, matrix_wrong = scoring.score_matrix(guesses, codes, number_of_colors)
+    for i, guess in enumerate(guesses):
+        exact, wrong = scoring.score(guess, codes, number_of_colors)
+        expected = np.array([solver.check_input(guess.tolist(), code.tolist()) for code in codes])
+        assert (exact == expected[:, 0]).all() and (wrong == expected[:, 1]).all()
+        assert (matrix_exact[i] == expected[:, 0]).all() and (matrix_wrong[i] == expected[:, 1]).all()
+
+def test_rank_round_trip():
+    ranks = np.arange(6 ** 4)
+    codes = scoring.unrank(ranks, 4, 6)
+    assert (codes == np.array(list(itertools.product(range(6), repeat=4)))).all()
+    assert (scoring.rank(codes, 6) == ranks).all()
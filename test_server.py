@@ -0,0 +1,55 @@
+import asyncio
+import json
+import pytest
+from server import SessionManager
+
+def respond_all(requests: list) -> list:
+    manager = SessionManager(workers = 1)
+
+    async def run() -> list:
+        return [await manager.respond(request if isinstance(request, bytes) else json.dumps(request).encode()) for request in requests]
+
+    try:
+        return asyncio.run(run())
+    finally:
+        manager.close()
+
+# Every malformed request is answered with an error instead of creating a session or failing the connection
+@pytest.mark.parametrize("request_line", [
+    b"not json",
+    [1, 2],
+    {"op": "bogus"},
+    {"op": "new", "colors": 0},
+    {"op": "new", "colors": 300},
+    {"op": "new", "code_length": 20, "colors": 6},
+    {"op": "new", "code_length": "4"},
+    {"op": "new", "algorithm": 2},
+    {"op": "new", "allow_duplicates": "no"},
+    {"op": "new", "human": 1},
+    {"op": "new", "options": []},
+    {"op": "new", "options": {"profile_dir": "/tmp"}},
+    {"op": "new", "options": {"use_feedback_table": True}},
+    {"op": "new", "options": {"strategy": "bogus"}},
+    {"op": "new", "options": {"migration_interval": 0}},
+    {"op": "new", "options": {"population_size": 1e9}},
+    {"op": "new", "options": {"use_symmetry": 1}},
+    {"op": "new", "secret": [0, 1, 2]},
+    {"op": "new", "secret": [0, 1, 2, 6]},
+    {"op": "new", "allow_duplicates": False, "secret": [0, 0, 0, 0]},
+    {"op": "step", "session": 1},
+])
+def test_bad_requests_are_answered_with_an_error(request_line):
+    response, = respond_all([request_line])
+    assert set(response) == {"error"}
+
+def test_response_echoes_request_id():
+    responses = respond_all([{"op": "new", "colors": 0, "id": 7}, {"op": "new", "secret": [0, 1, 2, 3], "id": "a"}])
+    assert responses[0]["id"] == 7 and "error" in responses[0]
+    assert responses[1] == {"session": 1, "code_length": 4, "colors": 6, "id": "a"}
+
+def test_bad_guess_keeps_the_session_playable():
+    responses = respond_all([{"op": "new", "human": True, "secret": [0, 1, 2, 3]}, {"op": "guess", "session": 1, "guess": [0, 1]},
+                             {"op": "guess", "session": 1, "guess": 5}, {"op": "step", "session": 1},
+                             {"op": "guess", "session": 1, "guess": [0, 1, 2, 3]}])
+    assert all("error" in response for response in responses[1:4])
+    assert responses[4] == {"guess": [0, 1, 2, 3], "exact": 4, "wrong": 0, "solved": True, "game_over": True}
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+import scoring
+import strategies
+from candidates import CandidateSet
+
+# (code_length, number_of_colors, allow_duplicates)
+BOARDS = [(4, 6, True), (3, 7, True), (4, 5, False), (5, 4, True)]
+
+# Collapsing guesses equivalent by symmetry never changes the selected guess, along whole games played with it
+@pytest.mark.parametrize("strategy", ["minimax", "expected_size", "entropy", "most_parts"])
+@pytest.mark.parametrize("code_length, number_of_colors, allow_duplicates", BOARDS)
+def test_symmetry_keeps_selected_guess(code_length: int, number_of_colors: int, allow_duplicates: bool, strategy: str):
+    rng = np.random.default_rng(code_length * 10 + number_of_colors)
+    secrets = CandidateSet(code_length, number_of_colors, allow_duplicates).get_codes()
+    for secret in secrets[rng.choice(len(secrets), 4, replace=False)]:
+        candidate_set = CandidateSet(code_length, number_of_colors, allow_duplicates)
+        guess_codes = np.zeros((0, code_length), dtype=np.uint8)
+        while len(candidate_set) > 1:
+            possible_ranks = candidate_set.get_ranks()
+            rank = strategies.select_guess(possible_ranks, code_length, number_of_colors, strategy, guess_codes = guess_codes)
+            assert rank == strategies.select_guess(possible_ranks, code_length, number_of_colors, strategy, guess_codes = None)
+            guess = scoring.unrank(np.array([rank]), code_length, number_of_colors)[0]
+            exact, wrong = scoring.score(guess, secret[None, :], number_of_colors)
+            candidate_set.filter(guess, (int(exact[0]), int(wrong[0])))
+            guess_codes = np.concatenate([guess_codes, guess[None, :]])